@@ -5,87 +5,527 @@ os.environ['DJANGO_SETTINGS_MODULE'] = 'simplelms.settings'
 import django
 django.setup()
 
+import argparse
 import csv
+import hashlib
+import io
 import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
 from random import randint
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
-from lms_core.models import Course, CourseMember, CourseContent, Comment
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.db.models import JSONField, Max
+from lms_core.cache import bump_catalog
+from lms_core.models import Course, CourseMember, CourseContent, Comment, CourseStats
+from lms_core.utils import chunked
 
 import time
-start_time = time.time()
 
 filepath = './csv_data/'
+BATCH_SIZE = 1000
+# Tabel yang ditulis importer; sequence-nya disetel ulang setelah import dengan COPY
+IMPORT_MODELS = [User, Course, CourseMember, CourseContent, Comment]
 
-with open(filepath+'user-data.csv') as csvfile:
+
+class ImportIndex:
+    """Indeks in-memory untuk semua lookup FK dan cek duplikat importer.
+
+    Diisi dengan beberapa query bulk di awal, lalu diperbarui setiap tahap
+    selesai, sehingga tidak ada query per baris.
+    """
+
+    def __init__(self):
+        self.usernames = set(User.objects.values_list('username', flat=True))
+        self.user_ids = set(User.objects.values_list('id', flat=True))
+        self.course_ids = set(Course.objects.values_list('id', flat=True))
+        self.refresh_members()
+        self.refresh_contents()
+        self.comment_ids = set(Comment.objects.values_list('id', flat=True))
+
+    def refresh_users(self):
+        self.user_ids = set(User.objects.values_list('id', flat=True))
+
+    def refresh_courses(self):
+        self.course_ids = set(Course.objects.values_list('id', flat=True))
+
+    def refresh_members(self):
+        # (course_id, user_id) -> id CourseMember pertama, sama seperti .first()
+        self.members = {}
+        for pk, course_id, user_id in CourseMember.objects.order_by('id').values_list('id', 'course_id', 'user_id'):
+            self.members.setdefault((course_id, user_id), pk)
+
+    def refresh_contents(self):
+        # content id -> course id
+        self.contents = dict(CourseContent.objects.values_list('id', 'course_id'))
+
+
+class OrmWriter:
+    name = 'orm'
+
+    def write(self, model, objs):
+        model.objects.bulk_create(objs)
+
+    def finish(self):
+        pass
+
+
+def copy_value(value):
+    # format teks COPY: NULL sebagai \N, backslash/tab/newline di-escape
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class CopyWriter:
+    """Tulis batch ke PostgreSQL dengan COPY FROM STDIN.
+
+    Id diisi sendiri mulai dari MAX(id)+1, jadi importer harus menjadi
+    satu-satunya penulis selama import dan sequence disetel ulang di finish().
+    finish() selalu dipanggil, juga bila import gagal di tengah jalan.
+    """
+    name = 'copy'
+
+    def __init__(self):
+        self.next_ids = {}
+
+    def write(self, model, objs):
+        if model not in self.next_ids:
+            self.next_ids[model] = (model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+        fields = model._meta.concrete_fields
+        buf = io.StringIO()
+        for obj in objs:
+            obj.pk = self.next_ids[model]
+            self.next_ids[model] += 1
+            values = [self.db_value(field, obj) for field in fields]
+            buf.write('\t'.join(copy_value(value) for value in values))
+            buf.write('\n')
+        buf.seek(0)
+
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN'
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(sql, buf)
+
+    @staticmethod
+    def db_value(field, obj):
+        value = field.pre_save(obj, True)
+        if isinstance(field, JSONField):
+            # adapter Jsonb milik driver tidak bisa ditulis sebagai teks COPY
+            return None if value is None else json.dumps(value, cls=field.encoder)
+        return field.get_db_prep_save(value, connection)
+
+    def finish(self):
+        # Semua tabel importer, bukan hanya yang ditulis pada run ini: tahap yang
+        # dilewati manifest bisa berisi baris dari run sebelumnya yang terputus
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), IMPORT_MODELS):
+                cursor.execute(sql)
+
+
+def get_writer(use_copy):
+    if use_copy and connection.vendor != 'postgresql':
+        print(f"--copy hanya untuk PostgreSQL, memakai ORM di {connection.vendor}")
+        return OrmWriter()
+    return CopyWriter() if use_copy else OrmWriter()
+
+
+class PasswordHasher:
+    """Hash password di process pool, urutan hasil sama dengan urutan input.
+
+    Dengan satu worker hashing berjalan di proses ini tanpa pool.
+    """
+
+    def __init__(self, workers, chunk_size):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.count = 0
+        self.elapsed = 0.0
+
+    def hash_many(self, passwords):
+        start = time.time()
+        if self.pool is None:
+            hashed = [make_password(password) for password in passwords]
+        else:
+            hashed = list(self.pool.map(make_password, passwords, chunksize=self.chunk_size))
+        self.elapsed += time.time() - start
+        self.count += len(hashed)
+        return hashed
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def report(self):
+        rate = self.count / self.elapsed if self.elapsed else 0
+        return f"password: {self.count} hash, {rate:.1f} hash/detik dengan {self.workers} worker"
+
+
+def iter_json_array(f, chunk_size=64 * 1024):
+    """Hasilkan elemen array JSON tingkat atas satu per satu dari file.
+
+    Hanya elemen yang sedang di-parse yang ditahan di memori, jadi ukuran file
+    tidak mempengaruhi pemakaian memori puncak.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read_more(size):
+        nonlocal buf, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def next_char():
+        # lewati whitespace, isi buffer bila perlu; '' berarti akhir file
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos+1]
+            read_more(chunk_size)
+
+    if next_char() != '[':
+        raise ValueError("file JSON harus berisi array di tingkat atas")
+    pos += 1
+    if next_char() == ']':
+        return
+
+    while True:
+        next_char()
+        read_size = chunk_size
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                obj = end = None
+            # elemen yang berakhir tepat di ujung buffer (mis. angka) mungkin belum lengkap
+            if end is not None and (end < len(buf) or eof):
+                break
+            read_more(read_size)
+            read_size *= 2
+        pos = end
+        yield obj
+
+        delimiter = next_char()
+        pos += 1
+        if delimiter == ']':
+            return
+        if delimiter != ',':
+            raise ValueError(f"karakter tak terduga {delimiter!r} di array JSON")
+
+
+def read_users(index, skipped, start, hasher):
+    def new_rows(reader):
+        for num, row in enumerate(reader):
+            if num < start:
+                continue
+            if row['username'] in index.usernames:
+                skipped['users'] += 1
+                continue
+            index.usernames.add(row['username'])
+            yield num, row
+
+    with open(filepath+'user-data.csv') as csvfile:
+        # baris dibaca dan di-hash per jendela: semua worker tetap sibuk, dan yang
+        # ditahan di memori hanya satu jendela, bukan seluruh file
+        for window in chunked(new_rows(csv.DictReader(csvfile)), hasher.workers * hasher.chunk_size * 4):
+            passwords = hasher.hash_many([row['password'] for _, row in window])
+            for (num, row), password in zip(window, passwords):
+                yield num+1, User(username=row['username'],
+                                  password=password,
+                                  email=row['email'],
+                                  first_name=row['firstname'],
+                                  last_name=row['lastname'])
+
+
+def read_courses(index, skipped, start):
+    with open(filepath+'course-data.csv') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for num, row in enumerate(reader):
+            if num < start:
+                continue
+            teacher_id = int(row['teacher'])
+            # tanpa checkpoint, baris ke-n dianggap sudah dimuat bila pk n ada
+            if (not start and num+1 in index.course_ids) or teacher_id not in index.user_ids:
+                skipped['courses'] += 1
+                continue
+            yield num+1, Course(name=row['name'], price=row['price'],
+                                description=row['description'],
+                                teacher_id=teacher_id)
+
+
+def read_members(index, skipped, start):
+    with open(filepath+'member-data.csv') as csvfile:
         reader = csv.DictReader(csvfile)
-        obj_create = []
         for num, row in enumerate(reader):
-            if not User.objects.filter(username=row['username']).exists():
-                obj_create.append(User(username=row['username'], 
-                                         password=make_password(row['password']), 
-                                         email=row['email'],
-                                         first_name=row['firstname'],
-                                         last_name=row['lastname']))
-        User.objects.bulk_create(obj_create)
-
-
-with open(filepath+'course-data.csv') as csvfile:
-    reader = csv.DictReader(csvfile)
-    obj_create = []
-    for num,row in enumerate(reader):
-        if not Course.objects.filter(pk=num+1).exists():
-            obj_create.append(Course(name=row['name'], price=row['price'],
-                                  description=row['description'], 
-                                  teacher=User.objects.get(pk=int(row['teacher']))))
-    Course.objects.bulk_create(obj_create)
-
-
-with open(filepath+'member-data.csv') as csvfile:
-    reader = csv.DictReader(csvfile)
-    obj_create = []
-    for num, row in enumerate(reader):
-        if not CourseMember.objects.filter(pk=num+1).exists():
-            obj_create.append(CourseMember(course_id=Course.objects.get(pk=int(row['course_id'])),
-                                        user_id=User.objects.get(pk=int(row['user_id'])), 
-                                        roles=row['roles']))
-    CourseMember.objects.bulk_create(obj_create)
-
-
-with open(filepath+'contents.json') as jsonfile:
-    comments = json.load(jsonfile)
-    obj_create = []
-    for num, row in enumerate(comments):
-        if not CourseContent.objects.filter(pk=num+1).exists():
-            obj_create.append(CourseContent(course_id=Course.objects.get(pk=int(row['course_id'])), 
-                                         video_url=row['video_url'], name=row['name'], 
-                                         description=row['description']))
-    CourseContent.objects.bulk_create(obj_create)
-
-
-with open(filepath+'comments.json') as jsonfile:  
-    comments = json.load(jsonfile)  
-    obj_create = []  
-    for num, row in enumerate(comments):  
-        if int(row['user_id']) > 50:  
-            row['user_id'] = randint(5, 40)  
-          
-        # Ambil CourseContent berdasarkan content_id  
-        content = CourseContent.objects.get(pk=int(row['content_id']))  
-          
-        # Ambil CourseMember berdasarkan course_id dan user_id  
-        course_member = CourseMember.objects.filter(  
-            course_id=content.course_id,  
-            user_id=int(row['user_id'])  
-        ).first()  # Mengambil objek CourseMember pertama yang cocok  
-  
-        if course_member and not Comment.objects.filter(pk=num+1).exists():  
-            obj_create.append(Comment(  
-                content_id=content,  
-                member_id=course_member,  # Menggunakan objek CourseMember  
-                comment=row['comment']  
-            ))  
-    Comment.objects.bulk_create(obj_create)  
-
-
-print("--- %s seconds ---" % (time.time() - start_time))
\ No newline at end of file
+            if num < start:
+                continue
+            key = (int(row['course_id']), int(row['user_id']))
+            if key in index.members or key[0] not in index.course_ids or key[1] not in index.user_ids:
+                skipped['members'] += 1
+                continue
+            # tandai supaya baris duplikat di file yang sama ikut dilewati
+            index.members[key] = None
+            yield num+1, CourseMember(course_id_id=key[0], user_id_id=key[1], roles=row['roles'])
+
+
+def read_contents(index, skipped, start):
+    with open(filepath+'contents.json') as jsonfile:
+        for num, row in enumerate(iter_json_array(jsonfile)):
+            if num < start:
+                continue
+            course_id = int(row['course_id'])
+            if (not start and num+1 in index.contents) or course_id not in index.course_ids:
+                skipped['contents'] += 1
+                continue
+            yield num+1, CourseContent(course_id_id=course_id,
+                                       video_url=row['video_url'], name=row['name'],
+                                       description=row['description'])
+
+
+def read_comments(index, skipped, start):
+    with open(filepath+'comments.json') as jsonfile:
+        for num, row in enumerate(iter_json_array(jsonfile)):
+            if num < start:
+                continue
+            if int(row['user_id']) > 50:
+                row['user_id'] = randint(5, 40)
+
+            # Ambil course dari konten dan member dari (course_id, user_id) lewat indeks
+            course_id = index.contents.get(int(row['content_id']))
+            member_id = index.members.get((course_id, int(row['user_id'])))
+
+            if member_id is None or (not start and num+1 in index.comment_ids):
+                skipped['comments'] += 1
+                continue
+            yield num+1, Comment(content_id_id=int(row['content_id']),
+                                 member_id_id=member_id,
+                                 comment=row['comment'])
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Checkpoint per file input: hash isi dan offset baris terakhir yang sudah di-commit.
+
+    Setiap entri juga menyimpan pk terbesar tabel tujuan saat di-commit. Entri
+    hanya dipercaya bila baris itu masih ada, jadi database yang dikosongkan atau
+    dibuat ulang (nama sama) tidak dianggap sudah terisi.
+
+    File yang hash-nya sama dan sudah selesai dilewati; file yang terputus
+    dilanjutkan dari offset terakhir. Bila isi file berubah, tahap dengan kunci
+    alami (username, pasangan course/user) diulang dari awal karena duplikat
+    tetap tersaring, sedangkan tahap posisional (course, konten, komentar)
+    dilanjutkan dari offset terakhir dengan asumsi ekspor hanya ditambah di akhir.
+    """
+
+    def __init__(self, path, database):
+        self.path = path
+        self.database = database
+        self.files = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            # manifest dari database lain tidak berlaku
+            if data.get('database') == database:
+                self.files = data.get('files', {})
+
+    def start(self, filename, digest, natural_key, model):
+        """Offset baris awal untuk file ini, atau None bila file bisa dilewati."""
+        entry = self.files.get(filename)
+        if entry is None or not self.rows_present(entry, model):
+            return 0
+        if entry['sha256'] == digest:
+            return None if entry['complete'] else entry['offset']
+        return 0 if natural_key else entry['offset']
+
+    @staticmethod
+    def rows_present(entry, model):
+        last_pk = entry.get('last_pk')
+        if last_pk is None:
+            # tabel kosong saat di-commit: tetap berlaku selama tabelnya masih kosong
+            return not model.objects.exists()
+        return model.objects.filter(pk=last_pk).exists()
+
+    def commit(self, filename, digest, offset, model, complete=False):
+        last_pk = model.objects.aggregate(last_pk=Max('pk'))['last_pk']
+        # tahap berjalan paralel, jadi penulisan manifest diserialkan
+        with self.lock:
+            self.files[filename] = {'sha256': digest, 'offset': offset, 'complete': complete,
+                                    'last_pk': last_pk}
+            self.save()
+
+    def offset(self, filename, default):
+        with self.lock:
+            return self.files.get(filename, {}).get('offset', default)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'database': self.database, 'files': self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def bulk_write(writer, model, rows, batch_size=BATCH_SIZE, checkpoint=None):
+    """Tulis pasangan (offset, objek) per batch, panggil checkpoint(offset) setelah tiap batch."""
+    created = 0
+    for batch in chunked(rows, batch_size):
+        writer.write(model, [obj for _, obj in batch])
+        created += len(batch)
+        if checkpoint is not None:
+            checkpoint(batch[-1][0])
+    return created
+
+
+class Stage:
+    def __init__(self, name, filename, model, reader, natural_key, refresh=None, depends_on=()):
+        self.name = name
+        self.filename = filename
+        self.model = model
+        self.reader = reader
+        # tahap dengan kunci alami aman dipindai ulang bila file berubah
+        self.natural_key = natural_key
+        # dipanggil setelah tahap selesai untuk memperbarui indeks tahap berikutnya
+        self.refresh = refresh
+        self.depends_on = set(depends_on)
+        self.created = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.status = 'menunggu'
+
+
+def run_stage(stage, index, writer, manifest, skipped, batch_size):
+    start_time = time.time()
+    try:
+        digest = file_hash(filepath+stage.filename)
+        start = manifest.start(stage.filename, digest, stage.natural_key, stage.model)
+        if start is None:
+            stage.status = 'tidak berubah'
+            return
+
+        def checkpoint(offset):
+            manifest.commit(stage.filename, digest, offset, stage.model)
+
+        rows = stage.reader(index, skipped, start)
+        stage.created = bulk_write(writer, stage.model, rows, batch_size, checkpoint)
+        manifest.commit(stage.filename, digest, manifest.offset(stage.filename, start), stage.model,
+                        complete=True)
+        if stage.refresh is not None:
+            stage.refresh()
+        stage.status = 'selesai'
+    finally:
+        stage.skipped = skipped[stage.name]
+        stage.seconds = time.time() - start_time
+        # setiap tahap memakai koneksi database milik thread-nya sendiri
+        connections.close_all()
+
+
+def run_stages(stages, jobs, *args):
+    """Jalankan tahap sesuai dependensinya; tahap yang saling bebas berjalan bersamaan."""
+    pending = {stage.name: stage for stage in stages}
+    done = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if stage.depends_on <= done:
+                    running[executor.submit(run_stage, stage, *args)] = stage
+                    del pending[name]
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                if future.exception() is not None:
+                    # jangan mulai tahap baru, tunggu yang masih berjalan lalu gagal
+                    pending.clear()
+                    wait(running)
+                    raise future.exception()
+                done.add(stage.name)
+
+
+def build_stages(index, hasher):
+    return [
+        Stage('users', 'user-data.csv', User, partial(read_users, hasher=hasher), True,
+              index.refresh_users),
+        Stage('courses', 'course-data.csv', Course, read_courses, False,
+              index.refresh_courses, depends_on=['users']),
+        Stage('members', 'member-data.csv', CourseMember, read_members, True,
+              index.refresh_members, depends_on=['users', 'courses']),
+        Stage('contents', 'contents.json', CourseContent, read_contents, False,
+              index.refresh_contents, depends_on=['courses']),
+        Stage('comments', 'comments.json', Comment, read_comments, False,
+              depends_on=['contents', 'members']),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import data awal LMS dari csv_data/")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="jumlah baris per bulk_create (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="jumlah proses untuk hashing password (default: %(default)s)")
+    parser.add_argument('--chunk-size', type=int, default=8,
+                        help="jumlah password per tugas worker (default: %(default)s)")
+    parser.add_argument('--copy', action='store_true',
+                        help="tulis dengan COPY FROM STDIN (PostgreSQL), jatuh ke ORM di database lain")
+    parser.add_argument('--manifest', default=filepath+'.import-manifest.json',
+                        help="lokasi file checkpoint (default: %(default)s)")
+    parser.add_argument('--full', action='store_true',
+                        help="abaikan checkpoint dan pindai ulang semua file")
+    parser.add_argument('--jobs', type=int,
+                        help="jumlah tahap yang boleh berjalan bersamaan (default: 1 di SQLite, 3 di database lain)")
+    args = parser.parse_args()
+    # SQLite hanya mengizinkan satu penulis, tahap paralel hanya akan saling menunggu lock
+    jobs = args.jobs or (1 if connection.vendor == 'sqlite' else 3)
+
+    start_time = time.time()
+    index = ImportIndex()
+    writer = get_writer(args.copy)
+    manifest = Manifest(args.manifest, str(connection.settings_dict['NAME']))
+    if args.full:
+        manifest.files = {}
+    hasher = PasswordHasher(args.workers, args.chunk_size)
+
+    stages = build_stages(index, hasher)
+    skipped = {stage.name: 0 for stage in stages}
+
+    try:
+        run_stages(stages, jobs, index, writer, manifest, skipped, args.batch_size)
+        # bulk_create/COPY melewati signal, jadi statistik matkul dihitung ulang sekali di akhir
+        # dan versi katalog dinaikkan manual
+        CourseStats.rebuild()
+        bump_catalog()
+    finally:
+        # batch yang sudah di-commit tetap ada walau import gagal, sequence harus ikut maju
+        writer.finish()
+        hasher.shutdown()
+
+    print(f"backend: {writer.name}, {jobs} tahap paralel")
+    for stage in stages:
+        print(f"{stage.name:<10} {stage.created:>8} dibuat {stage.skipped:>8} dilewati "
+              f"{stage.seconds:>9.3f} s  ({stage.status})")
+    print(hasher.report())
+    print(f"{'total':<10} {time.time() - start_time:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,69 +1,103 @@
+from typing import Literal, Optional
+from datetime import datetime
 from ninja import NinjaAPI, UploadedFile, File, Form
 from ninja.responses import Response
 from lms_core.schema import CourseSchemaOut, CourseMemberOut, CourseSchemaIn
 from lms_core.schema import UserRegistrationSchema, UserRegistrationSchemaOut
 from lms_core.schema import AnnouncementSchemaIn,AnnouncementSchemaOut
-from lms_core.schema import CourseContentMini, CourseContentFull
+from lms_core.schema import CourseContentMini, CourseContentFull, CourseOutlineNode
 from lms_core.schema import CourseCommentOut, CourseCommentIn
-from lms_core.schema import FeedbackSchemaIn, FeedbackSchemaOut, FeedbackListSchemaOut, ShowFeedbackSchemaOut, EditFeedbackSchema
+from lms_core.schema import FeedbackSchemaIn, FeedbackSchemaOut, ShowFeedbackSchemaOut, EditFeedbackSchema
 from lms_core.schema import BookmarkSchemaIn, BookmarkSchemaOut, ShowBookmarkSchemaOut
 from lms_core.schema import BatchEnrollSchemaIn
-from lms_core.models import Course, CourseMember, CourseContent, Comment, Announcement, Feedback, Bookmark
+from lms_core.schema import SearchResultsOut, CourseRatingOut
+from lms_core.models import Course, CourseMember, CourseContent, Comment, Announcement, Feedback, Bookmark, CourseStats
 from ninja_simple_jwt.auth.views.api import mobile_auth_router
-from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
-from ninja.pagination import paginate, PageNumberPagination
-from .utils import validate_password 
+from ninja.pagination import paginate
+from .utils import validate_password, chunked
+from .errors import ApiError
+from .pagination import KeysetPagination
+from .renderers import get_renderer, get_parser
+from .auth import JwtAuth
+from .tasks import schedule, generate_course_image_variants, fill_inbox
+from .downloads import serve_attachment
+from .cache import get_dashboard, invalidate_dashboard, get_membership, set_memberships, get_outline
+from .outline import outline_rows, build_outline
+from . import search as fulltext
+from .conditional import conditional, catalog_state, course_state, course_contents_state, content_state
 from django.contrib.auth.models import User
 from django.http import JsonResponse 
-from django.db.models import Count  
+from django.db import connection
+from django.db.models import CharField, Count, F, Value  
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from asgiref.sync import sync_to_async
 import logging
 logger = logging.getLogger(__name__)
 
-apiv1 = NinjaAPI()
+apiv1 = NinjaAPI(renderer=get_renderer(), parser=get_parser())
 apiv1.add_router("/auth/", mobile_auth_router)
-apiAuth = HttpJwtAuth()
+apiAuth = JwtAuth()
+
+
+@apiv1.exception_handler(ApiError)
+def api_error(request, exc):
+    return apiv1.create_response(request, {"error": exc.message}, status=exc.status)
+
+ENROLL_CHUNK_SIZE = 5000
 
 @apiv1.get("/hello")
 def hello(request):
     return "Hello World"
  
+# Kolom rating CourseSchemaOut, diambil dari CourseStats lewat join
+RATING_FIELDS = {"rating_count": F("stats__feedback_count"), "rating_mean": F("stats__rating_mean")}
+
 # - paginate list_courses
 @apiv1.get("/courses", response=list[CourseSchemaOut])
-@paginate(PageNumberPagination, page_size=10)
-def list_courses(request):
-    courses = Course.objects.select_related('teacher').all()
+@conditional(catalog_state)
+@paginate(KeysetPagination, page_size=10)
+async def list_courses(request, min_rating: Optional[float] = None, sort: Literal["newest", "rating"] = "newest"):
+    # Ringkasan rating dibaca dari CourseStats, tidak menyentuh tabel feedback
+    courses = Course.objects.select_related('teacher').annotate(**RATING_FIELDS)
+    if min_rating is not None:
+        courses = courses.filter(stats__rating_mean__gte=min_rating)
+    if sort == "rating":
+        # kunci keyset tidak boleh NULL; course tanpa rating berada di akhir
+        courses = courses.annotate(rating_rank=Coalesce("stats__rating_mean", Value(-1.0))).order_by("-rating_rank", "-id")
     return courses
 
 # - my courses
 @apiv1.get("/mycourses", auth=apiAuth, response=list[CourseMemberOut])
+@paginate(KeysetPagination)
 def my_courses(request):
     logger.info(f"User in create_announcement: {request.user}, Authenticated: {request.user.is_authenticated}")
-    user = User.objects.get(id=request.user.id)
-    courses = CourseMember.objects.select_related('user_id', 'course_id').filter(user_id=user)
+    courses = CourseMember.objects.select_related('user_id', 'course_id').filter(user_id=request.user.id)
     return courses
 
 # - create course
 @apiv1.post("/courses", auth=apiAuth, response={201:CourseSchemaOut})
 def create_course(request, data: Form[CourseSchemaIn], image: UploadedFile = File(None)):
-    user = User.objects.get(id=request.user.id)
     course = Course(
         name=data.name,
         description=data.description,
         price=data.price,
-        image=image,
-        teacher=user
+        teacher_id=request.user.id
     )
 
+    # Upload sudah berupa file sementara di disk; thumbnail dibuat di background
     if image:
-        course.image.save(image.name, image)
+        course.image.save(image.name, image, save=False)
 
     course.save()
+    if image:
+        schedule(generate_course_image_variants, course.id, course.image.name)
     return 201, course
 
 # - update course
 @apiv1.post("/courses/{course_id}", auth=apiAuth, response=CourseSchemaOut)
 def update_course(request, course_id: int, data: Form[CourseSchemaIn], image: UploadedFile = File(None)):
-    if request.user.id != Course.objects.get(id=course_id).teacher.id:
+    if request.user.id != Course.objects.get(id=course_id).teacher_id:
         message = {"error": "Anda tidak diijinkan update course ini"}
         return Response(message, status=401)
     
@@ -71,89 +105,183 @@ def update_course(request, course_id: int, data: Form[CourseSchemaIn], image: Up
     course.name = data.name
     course.description = data.description
     course.price = data.price
+    stale_variants = list(course.image_variants.values())
     if image:
-        course.image.save(image.name, image)
+        course.image.save(image.name, image, save=False)
+        course.image_variants = {}
     course.save()
+    if image:
+        schedule(generate_course_image_variants, course.id, course.image.name, stale_variants)
     return course
 
 # - detail course
 @apiv1.get("/courses/{course_id}", response=CourseSchemaOut)
-def detail_course(request, course_id: int):
-    course = Course.objects.select_related('teacher').get(id=course_id)
+@conditional(course_state)
+async def detail_course(request, course_id: int):
+    course = await Course.objects.select_related('teacher').annotate(**RATING_FIELDS).aget(id=course_id)
     return course
 
+# - ringkasan rating course
+@apiv1.get("/courses/{course_id}/rating", response=CourseRatingOut)
+async def course_rating(request, course_id: int):
+    # Ringkasan dijaga tetap terkini oleh signal Feedback, cukup baca satu baris
+    stats = await CourseStats.objects.filter(course_id=course_id).afirst()
+    if stats is None:
+        if not await Course.objects.filter(id=course_id).aexists():
+            return Response({"error": "Course not found."}, status=404)
+        stats, = await sync_to_async(CourseStats.rebuild)([course_id])
+    return {
+        "course_id": course_id,
+        "count": stats.feedback_count,
+        "mean": stats.rating_mean,
+        "histogram": stats.rating_histogram,
+    }
+
 # - list content course
 @apiv1.get("/courses/{course_id}/contents", response=list[CourseContentMini])
-def list_content_course(request, course_id: int):
-    contents = CourseContent.objects.filter(course_id=course_id)
-    return contents
+@conditional(course_contents_state)
+async def list_content_course(request, course_id: int):
+    # relasi course dan teacher ikut diambil; di view async relasi tidak bisa dimuat malas
+    contents = CourseContent.objects.filter(course_id=course_id).select_related('course_id__teacher')
+    return [content async for content in contents]
+
+# - pencarian full-text course dan konten
+@apiv1.get("/search", response=SearchResultsOut)
+def search(request, q: str, limit: int = 20, offset: int = 0):
+    limit = min(max(limit, 1), 100)
+    offset = max(offset, 0)
+    # ambil satu baris lebih untuk tahu apakah masih ada halaman berikutnya
+    results = fulltext.search(connection, q, limit + 1, offset)
+    next_offset = offset + limit if len(results) > limit else None
+    return {"items": results[:limit], "next_offset": next_offset}
+
+# - outline (hierarki parent_id) konten course
+@apiv1.get("/courses/{course_id}/outline", response=list[CourseOutlineNode])
+def course_outline(request, course_id: int):
+    def compute():
+        rows = outline_rows(course_id)
+        if not rows and not Course.objects.filter(id=course_id).exists():
+            return None
+        return build_outline(rows)
+
+    # Pohon disimpan di cache per course dan dihapus oleh signal saat konten berubah
+    outline = get_outline(course_id, compute)
+    if outline is None:
+        return Response({"error": "Course not found."}, status=404)
+    return outline
 
 # - detail content course
 @apiv1.get("/courses/{course_id}/contents/{content_id}", response=CourseContentFull)
+@conditional(content_state)
 def detail_content_course(request, course_id: int, content_id: int):
     content = CourseContent.objects.get(id=content_id)
     return content
 
+# - unduh lampiran konten
+@apiv1.get("/contents/{content_id}/attachment", auth=apiAuth)
+def download_attachment(request, content_id: int):
+    content = (CourseContent.objects.filter(id=content_id)
+               .values_list('course_id', 'course_id__teacher_id', 'file_attachment').first())
+    if content is None:
+        return Response({"error": "Content not found."}, status=404)
+    course_id, teacher_id, attachment = content
+    if request.user.id != teacher_id and get_membership(course_id, request.user.id) is None:
+        return Response({"error": "You are not authorized to download this attachment."}, status=403)
+
+    # Range, ETag/Last-Modified dan sendfile/X-Accel-Redirect ditangani lms_core.downloads
+    response = serve_attachment(request, attachment) if attachment else None
+    if response is None:
+        return Response({"error": "Attachment not found."}, status=404)
+    return response
+
 # - batch enroll course
 @apiv1.post("/courses/{course_id}/enroll-batch", auth=apiAuth, response={200: dict})  
 def batch_enroll_students(request, course_id: int, data: BatchEnrollSchemaIn):  
     # Cek apakah kursus ada dan milik pengajar  
-    teacher = User.objects.get(id=request.user.id)
-    try:  
-        course = Course.objects.get(id=course_id, teacher=teacher)  
-    except Course.DoesNotExist:  
+    if not Course.objects.filter(id=course_id, teacher_id=request.user.id).exists():  
         return Response({"error": "Course not found or you do not have permission."}, status=404)  
   
-    # Daftar untuk menyimpan hasil pendaftaran  
-    enrolled_students = []  
-    already_enrolled = []  
-  
-    for student_id in data.student_ids:  
-        try:  
-            student = User.objects.get(id=student_id)  
-            # Cek apakah siswa sudah terdaftar di kursus  
-            if not CourseMember.objects.filter(course_id=course, user_id=student).exists():  # Menggunakan course_id dan user_id  
-                # Daftarkan siswa ke kursus  
-                CourseMember.objects.create(course_id=course, user_id=student)  # Menggunakan course_id dan user_id  
-                enrolled_students.append(student_id)  
-            else:  
-                already_enrolled.append(student_id)  
-        except User.DoesNotExist:  
-            return Response({"error": f"Student with ID {student_id} does not exist."}, status=404)  
+    # Buang id ganda tanpa mengubah urutan  
+    student_ids = list(dict.fromkeys(data.student_ids))  
+  
+    # Ambil user yang valid dan yang sudah terdaftar secara massal, dipecah per chunk  
+    # supaya jumlah parameter query tetap di bawah batas database  
+    valid_ids = set()  
+    member_ids = set()  
+    for chunk in chunked(student_ids, ENROLL_CHUNK_SIZE):  
+        valid_ids.update(User.objects.filter(id__in=chunk).values_list('id', flat=True))  
+        member_ids.update(CourseMember.objects.filter(course_id=course_id, user_id__in=chunk)  
+                          .values_list('user_id', flat=True))  
+  
+    enrolled_students = [sid for sid in student_ids if sid in valid_ids and sid not in member_ids]  
+    already_enrolled = [sid for sid in student_ids if sid in member_ids]  
+    not_found = [sid for sid in student_ids if sid not in valid_ids]  
+  
+    CourseMember.objects.bulk_create(  
+        [CourseMember(course_id_id=course_id, user_id_id=sid, roles="std") for sid in enrolled_students],  
+        batch_size=ENROLL_CHUNK_SIZE, ignore_conflicts=True  
+    )  
+    # bulk_create tidak memicu signal, jadi statistik matkul, dashboard siswa, cache  
+    # keanggotaan dan inbox diperbarui di sini  
+    CourseStats.rebuild([course_id])  
+    invalidate_dashboard(*enrolled_students)  
+    for chunk in chunked(enrolled_students, ENROLL_CHUNK_SIZE):  
+        rows = CourseMember.objects.filter(course_id=course_id, user_id__in=chunk).values_list("user_id", "id", "roles")  
+        set_memberships(course_id, {user_id: (member_id, roles) for user_id, member_id, roles in rows})  
+    if enrolled_students:
+        schedule(fill_inbox, course_id, enrolled_students)
   
     return {  
         "enrolled_students": enrolled_students,  
         "already_enrolled": already_enrolled,  
+        "not_found": not_found,  
     }  
 
 # - enroll course
 @apiv1.post("/courses/{course_id}/enroll", auth=apiAuth, response=CourseMemberOut)
 def enroll_course(request, course_id: int):
-    user = User.objects.get(id=request.user.id)
     course = Course.objects.get(id=course_id)
-    course_member = CourseMember(course_id=course, user_id=user, roles="std")
-    course_member.save()
+    # Pasangan course/user unik, jadi pendaftaran ulang mengembalikan keanggotaan yang ada
+    course_member, _ = CourseMember.objects.get_or_create(course_id=course, user_id_id=request.user.id,
+                                                          defaults={"roles": "std"})
     # print(course_member)
     return course_member
 
 # - list content comment
-@apiv1.get("/contents/{content_id}/comments", auth=apiAuth, response=list[CourseContentMini])
-def list_content_comment(request, content_id: int):
-    comments = CourseContent.objects.filter(course_id=content_id)
+@apiv1.get("/contents/{content_id}/comments", auth=apiAuth, response=list[CourseCommentOut])
+@paginate(KeysetPagination)
+def list_content_comment(request, content_id: int, since: Optional[datetime] = None):
+    content = CourseContent.objects.filter(id=content_id).values_list('course_id', 'course_id__teacher_id').first()
+    if content is None:
+        raise ApiError("Content not found.", status=404)
+    course_id, teacher_id = content
+    if request.user.id != teacher_id and get_membership(course_id, request.user.id) is None:
+        raise ApiError("You are not authorized to view comments in this content", status=403)
+
+    # Semua relasi yang dibutuhkan CourseCommentOut diambil dalam satu query
+    comments = Comment.objects.filter(content_id=content_id).select_related(
+        'content_id__course_id__teacher', 'member_id__user_id', 'member_id__course_id__teacher'
+    )
+    # since: hanya komentar yang lebih baru dari waktu tersebut
+    if since is not None:
+        comments = comments.filter(created_at__gt=since)
     return comments
 
 # - create content comment
 @apiv1.post("/contents/{content_id}/comments", auth=apiAuth, response={201: CourseCommentOut})
 def create_content_comment(request, content_id: int, data: CourseCommentIn):
-    user = User.objects.get(id=request.user.id)
-    content = CourseContent.objects.get(id=content_id)
+    content = CourseContent.objects.select_related('course_id__teacher').get(id=content_id)
 
-    if not content.course_id.is_member(user):
+    # Cek keanggotaan sekaligus ambil id member-nya dari cache keanggotaan course
+    membership = get_membership(content.course_id_id, request.user.id)
+    if membership is None:
         message =  {"error": "You are not authorized to create comment in this content"}
         return Response(message, status=401)
-    
-    member = CourseMember.objects.get(course_id=content.course_id, user_id=user)
-    
+
+    # Relasi untuk CourseCommentOut sudah dimuat di sini, jadi serialisasi dan
+    # signal komentar tidak melakukan query tambahan
+    member = CourseMember.objects.select_related('user_id').get(id=membership[0])
+    member.course_id = content.course_id
     comment = Comment(
         content_id=content,
         member_id=member,
@@ -165,8 +293,9 @@ def create_content_comment(request, content_id: int, data: CourseCommentIn):
 # - delete content comment
 @apiv1.delete("/comments/{comment_id}", auth=apiAuth)
 def delete_comment(request, comment_id: int):
-    comment = Comment.objects.get(id=comment_id)
-    if comment.member_id.user_id.id != request.user.id:
+    # member dan konten ikut dimuat: dipakai cek pemilik dan oleh signal hapus komentar
+    comment = Comment.objects.select_related('member_id', 'content_id').get(id=comment_id)
+    if comment.member_id.user_id_id != request.user.id:
         return {"error": "You are not authorized to delete this comment"}
     comment.delete()
     return {"message": "Comment deleted"}   
@@ -197,49 +326,37 @@ def register(request, data: UserRegistrationSchema):
 
 @apiv1.get("/user/activity/dashboard", auth=apiAuth, response={200: dict})  
 def user_activity_dashboard(request):  
-    user = User.objects.get(id=request.user.id) 
-  
-    # Menghitung jumlah kursus yang diikuti  
-    courses_joined = CourseMember.objects.filter(user_id=user).count()  # Pastikan menggunakan user_id  
-  
-    # Menghitung jumlah kursus yang dibuat  
-    courses_created = Course.objects.filter(teacher=user).count()  
-  
-    # Menghitung jumlah komentar yang ditulis  
-    comments_written = Comment.objects.filter(member_id__user_id=user).count()  # Menggunakan member_id untuk mengakses user  
+    user_id = request.user.id  
+  
+    def compute():  
+        return {  
+            # Menghitung jumlah kursus yang diikuti  
+            "courses_joined": CourseMember.objects.filter(user_id=user_id).count(),  
+            # Menghitung jumlah kursus yang dibuat  
+            "courses_created": Course.objects.filter(teacher_id=user_id).count(),  
+            # Menghitung jumlah komentar yang ditulis  
+            "comments_written": Comment.objects.filter(member_id__user_id=user_id).count(),  
+        }  
   
-    # Mengembalikan statistik dalam format JSON  
-    return {  
-        "courses_joined": courses_joined,  
-        "courses_created": courses_created,  
-        "comments_written": comments_written,
-    }  
+    # Statistik diambil dari cache dan dihapus oleh signal saat data user berubah  
+    return get_dashboard(user_id, compute)  
 
 @apiv1.get("/courses/{course_id}/analytics", response={200: dict})  
 def course_analytics(request, course_id: int):  
-    try:  
-        course = Course.objects.get(id=course_id)  
-    except Course.DoesNotExist:  
-        return Response({"error": "Course not found."}, status=404)  
-  
-    # Menghitung jumlah anggota kursus  
-    members_count = CourseMember.objects.filter(course_id=course).count()  
-  
-    # Menghitung jumlah konten dalam kursus  
-    content_count = CourseContent.objects.filter(course_id=course).count()  
-  
-    # Menghitung jumlah komentar untuk kursus  
-    comments_count = Comment.objects.filter(content_id__course_id=course).count()  
-  
-    # Menghitung jumlah umpan balik untuk kursus (jika model Feedback ada)  
-    feedback_count = Feedback.objects.filter(course_id=course).count()  # Pastikan model Feedback ada  
+    # Penghitung dijaga tetap terkini oleh signal (lms_core/signals.py), jadi cukup baca satu baris  
+    stats = CourseStats.objects.filter(course_id=course_id).first()  
+    if stats is None:  
+        if not Course.objects.filter(id=course_id).exists():  
+            return Response({"error": "Course not found."}, status=404)  
+        # Matkul belum punya baris statistik, hitung sekali dari tabel sumber  
+        stats, = CourseStats.rebuild([course_id])  
   
     # Mengembalikan statistik dalam format JSON  
     return {  
-        "members_count": members_count,  
-        "content_count": content_count,  
-        "comments_count": comments_count,  
-        "feedback_count": feedback_count,  
+        "members_count": stats.members_count,  
+        "content_count": stats.content_count,  
+        "comments_count": stats.comments_count,  
+        "feedback_count": stats.feedback_count,  
     }  
 
 @apiv1.post("/courses/{course_id}/announcements", auth=apiAuth, response={201: AnnouncementSchemaOut})  
@@ -250,57 +367,69 @@ def create_announcement(request, course_id: int, data: AnnouncementSchemaIn):
     except Course.DoesNotExist:  
         return Response({"error": "Course not found."}, status=404)  
     
-    teacher = User.objects.get(id=request.user.id)
-  
     # Cek apakah pengguna yang membuat pengumuman adalah guru dari course  
-    if request.user.id != course.teacher.id:  
+    if request.user.id != course.teacher_id:  
         return Response({"error": "You are not authorized to create an announcement for this course."}, status=403)  
   
     # Buat pengumuman baru  
     announcement = Announcement(  
         course=course,  
-        teacher=teacher,  
+        teacher_id=request.user.id,  
         title=data.title,  
         content=data.content,  
     )  
+    if data.date_announcement is not None:
+        announcement.date_announcement = data.date_announcement
     announcement.save()  
   
     return 201, {  
         "id": announcement.id,  
-        "course_id": announcement.course.id,  
-        "teacher_id": announcement.teacher.id,  
+        "course_id": announcement.course_id,  
+        "teacher_id": announcement.teacher_id,  
         "title": announcement.title,  
         "content": announcement.content,  
         "date_created": announcement.date_created,  
         "date_announcement": announcement.date_announcement  
     }  
 
+# Kolom yang dibutuhkan AnnouncementSchemaOut; daftar pengumuman diambil sebagai dict
+ANNOUNCEMENT_FIELDS = ("id", "course_id", "teacher_id", "title", "content", "date_created", "date_announcement")
+
 @apiv1.get("/courses/{course_id}/announcements",auth=apiAuth, response=list[AnnouncementSchemaOut])  
-def show_announcements(request, course_id: int):  
+@paginate(KeysetPagination, ordering=("-date_announcement", "-id"))  
+async def show_announcements(request, course_id: int):  
     # Cek apakah course ada  
-    try:  
-        course = Course.objects.get(id=course_id)  
-    except Course.DoesNotExist:  
-        return Response({"error": "Course not found."}, status=404)  
-  
-    # Ambil semua pengumuman untuk course tersebut  
-    announcements = Announcement.objects.filter(course=course)  
-  
-    # Format data untuk respons  
-    response_data = [  
-        {  
-            "id": announcement.id,  
-            "course_id": announcement.course.id,  
-            "teacher_id": announcement.teacher.id,  
-            "title": announcement.title,  
-            "content": announcement.content,  
-            "date_created": announcement.date_created,  
-            "date_announcement": announcement.date_announcement  
-        }  
-        for announcement in announcements  
-    ]  
-  
-    return response_data  
+    teacher_id = await Course.objects.filter(id=course_id).values_list("teacher_id", flat=True).afirst()
+    if teacher_id is None:  
+        raise ApiError("Course not found.", status=404)  
+  
+    # Ambil pengumuman untuk course tersebut, dipaginasi per cursor  
+    announcements = Announcement.objects.filter(course_id=course_id).values(*ANNOUNCEMENT_FIELDS)
+    # Pengumuman terjadwal hanya terlihat oleh guru sampai date_announcement tiba
+    if request.user.id != teacher_id:
+        announcements = announcements.filter(date_announcement__lte=timezone.now())
+    return announcements
+
+@apiv1.get("/inbox", auth=apiAuth, response=list[AnnouncementSchemaOut])
+@paginate(KeysetPagination, ordering=("-date_announcement", "-id"))
+def inbox(request):
+    # Dua sumber yang digabung per cursor, masing-masing paling banyak satu halaman:
+    # salinan fan-out milik user (index inbox_user_date_idx) dan pengumuman course
+    # besar yang tidak di-fan-out (index announcement_course_date_idx)
+    now = timezone.now()
+    user_id = request.user.id
+    fanned_out = (Announcement.objects
+                  .filter(inbox_items__user_id=user_id, inbox_items__date_announcement__lte=now)
+                  .annotate(inbox_date=F("inbox_items__date_announcement"),
+                            inbox_announcement=F("inbox_items__announcement"))
+                  .order_by("-inbox_date", "-inbox_announcement")
+                  .values(*ANNOUNCEMENT_FIELDS, "inbox_date", "inbox_announcement"))
+    enrolled = CourseMember.objects.filter(user_id=user_id).values("course_id")
+    merged_on_read = (Announcement.objects
+                      .filter(fanned_out=False, course_id__in=enrolled, date_announcement__lte=now)
+                      .order_by("-date_announcement", "-id")
+                      .values(*ANNOUNCEMENT_FIELDS))
+    return [fanned_out, merged_on_read]
 
 @apiv1.put("/announcements/{announcement_id}",auth=apiAuth, response=AnnouncementSchemaOut)  
 def edit_announcement(request, announcement_id: int, data: AnnouncementSchemaIn):   
@@ -312,18 +441,20 @@ def edit_announcement(request, announcement_id: int, data: AnnouncementSchemaIn)
         return Response({"error": "Announcement not found."}, status=404)  
   
     # Cek apakah pengguna adalah teacher dari course yang bersangkutan  
-    if request.user.id != announcement.teacher.id:  
+    if request.user.id != announcement.teacher_id:  
         return Response({"error": "You are not authorized to edit this announcement."}, status=403)  
   
     # Perbarui pengumuman  
     announcement.title = data.title  
     announcement.content = data.content  
+    if data.date_announcement is not None:
+        announcement.date_announcement = data.date_announcement
     announcement.save()  
   
     return {  
         "id": announcement.id,  
-        "course_id": announcement.course.id,  
-        "teacher_id": announcement.teacher.id,  
+        "course_id": announcement.course_id,  
+        "teacher_id": announcement.teacher_id,  
         "title": announcement.title,  
         "content": announcement.content,  
         "date_created": announcement.date_created,  
@@ -341,7 +472,7 @@ def delete_announcement(request, announcement_id: int):
         return Response({"error": "Announcement not found."}, status=404)  
   
     # Cek apakah pengguna adalah teacher dari course yang bersangkutan  
-    if request.user.id != announcement.teacher.id:  
+    if request.user.id != announcement.teacher_id:  
         return Response({"error": "You are not authorized to delete this announcement."}, status=403)  
   
     # Hapus pengumuman  
@@ -350,52 +481,36 @@ def delete_announcement(request, announcement_id: int):
 
 @apiv1.post("/courses/{course_id}/feedback", auth=apiAuth, response={200:FeedbackSchemaOut})  
 def add_feedback(request, course_id: int, data: FeedbackSchemaIn):  
-    # Cek apakah course ada  
-    # course = Course.objects.get(id=course_id)  
-    try:  
-        course = Course.objects.get(id=course_id)  
-    except Course.DoesNotExist:  
-        return Response({"error": "Course not found."}, status=404)  
-    
-    student = User.objects.get(id=request.user.id) 
-    if not CourseMember.objects.filter(course_id=course, user_id=student).exists():  
+    # Cek keanggotaan dari cache; course yang punya anggota pasti ada  
+    if get_membership(course_id, request.user.id) is None:  
+        if not Course.objects.filter(id=course_id).exists():  
+            return Response({"error": "Course not found."}, status=404)  
         return Response({"error": "You are not authorized to provide feedback for this course."}, status=403) 
   
     # Buat umpan balik baru  
     feedback = Feedback(  
-        course=course,  
-        student=student,
+        course_id=course_id,  
+        student_id=request.user.id,
         rating=data.rating,  
         comments=data.comments  
     )  
     feedback.save()  
     return 200,feedback
 
-@apiv1.get("/courses/{course_id}/feedback", response=FeedbackListSchemaOut)  
-def show_feedback(request, course_id: int):  
-    # Cek apakah course ada  
-    try:  
-        course = Course.objects.get(id=course_id)  
-    except Course.DoesNotExist:  
-        return Response({"error": "Course not found."}, status=404)  
-  
-    # Ambil semua umpan balik untuk kursus tersebut  
-    feedbacks = Feedback.objects.filter(course=course)  
-  
-    # Siapkan data untuk respons  
-    feedback_list = [  
-        {  
-            "id": feedback.id,  
-            "course_name": feedback.course.name,  # Ambil nama kursus  
-            "student_name": feedback.student.username,  # Ambil nama pengguna siswa  
-            "rating": feedback.rating,  
-            "comments": feedback.comments,  
-            "created_at": feedback.created_at  
-        }  
-        for feedback in feedbacks  
-    ]  
-  
-    return {"feedbacks": feedback_list}  
+@apiv1.get("/courses/{course_id}/feedback", response=list[ShowFeedbackSchemaOut])  
+@paginate(KeysetPagination, items_attribute="feedbacks")  
+async def show_feedback(request, course_id: int):  
+    # Cek apakah course ada; namanya sekalian diambil untuk semua baris
+    course_name = await Course.objects.filter(id=course_id).values_list("name", flat=True).afirst()
+    if course_name is None:  
+        raise ApiError("Course not found.", status=404)  
+  
+    # Satu query untuk seluruh halaman: hanya kolom ShowFeedbackSchemaOut, nama siswa lewat join  
+    return Feedback.objects.filter(course_id=course_id).values(  
+        "id", "rating", "comments", "created_at",
+        course_name=Value(course_name, output_field=CharField()),
+        student_name=F("student__username"),  
+    )  
 
 @apiv1.put("/course/feedback/{feedback_id}", auth=apiAuth, response=FeedbackSchemaOut)   
 def edit_feedback(request, feedback_id: int, data: EditFeedbackSchema):    
@@ -406,7 +521,7 @@ def edit_feedback(request, feedback_id: int, data: EditFeedbackSchema):
         return Response({"error": "Feedback not found."}, status=404)    
     
     # Cek apakah pengguna adalah siswa yang memberikan umpan balik ini    
-    if request.user.id != feedback.student.id:    
+    if request.user.id != feedback.student_id:    
         return Response({"error": "You are not authorized to edit this feedback."}, status=403)    
     
     # Perbarui umpan balik    
@@ -418,8 +533,8 @@ def edit_feedback(request, feedback_id: int, data: EditFeedbackSchema):
         "message": "Comment updated",  # Tambahkan pesan ini  
         "feedback": FeedbackSchemaOut(    
             id=feedback.id,    
-            course_id=feedback.course.id,    
-            student_id=feedback.student.id,    
+            course_id=feedback.course_id,    
+            student_id=feedback.student_id,    
             rating=feedback.rating,    
             comments=feedback.comments,    
             created_at=feedback.created_at    
@@ -435,7 +550,7 @@ def delete_feedback(request, feedback_id: int):
         return Response({"error": "Feedback not found."}, status=404)  
   
     # Cek apakah pengguna adalah siswa yang memberikan umpan balik ini  
-    if request.user.id != feedback.student.id:  
+    if request.user.id != feedback.student_id:  
         return Response({"error": "You are not authorized to delete this feedback."}, status=403)  
   
     # Hapus umpan balik  
@@ -451,45 +566,31 @@ def add_bookmark(request, data: BookmarkSchemaIn):
     except CourseContent.DoesNotExist:    
         return Response({"error": "Content not found."}, status=404)  
     
-    student = User.objects.get(id=request.user.id) 
-  
-    # Buat umpan balik baru  
+    # Buat bookmark baru  
     bookmark = Bookmark(  
-        student=student,  
+        student_id=request.user.id,  
         content_id=data.content_id
     )  
     bookmark.save()   
     return BookmarkSchemaOut(  
         id=bookmark.id,  
-        content_id=bookmark.content.id,  
-        student=bookmark.student.id,  
+        content_id=bookmark.content_id,  
+        student=bookmark.student_id,  
         created_at=bookmark.created_at  
     ) 
 
 @apiv1.get("/content/bookmarks", auth=apiAuth, response={200: list[BookmarkSchemaOut]})  
+@paginate(KeysetPagination)  
 def show_bookmarks(request):  
-    student = User.objects.get(id=request.user.id) 
-  
-    # Mengambil semua bookmark yang dibuat oleh pengguna  
-    bookmarks = Bookmark.objects.filter(student=student).select_related('content')  
-  
-    # Mengembalikan daftar bookmark dengan informasi konten  
-    return [  
-        BookmarkSchemaOut(  
-            id=bookmark.id,  
-            content_id=bookmark.content.id,  
-            student=bookmark.student.id,  
-            created_at=bookmark.created_at  
-        )  
-        for bookmark in bookmarks  
-    ]  
+    # Mengambil bookmark milik pengguna, dipaginasi per cursor  
+    return Bookmark.objects.filter(student_id=request.user.id).values(  
+        "id", "content_id", "student", "created_at"  
+    )  
 
 @apiv1.delete("/content/bookmark/{bookmark_id}", auth=apiAuth, response={200: None})  
 def delete_bookmark(request, bookmark_id: int):  
-    student = User.objects.get(id=request.user.id) 
-  
     try:  
-        bookmark = Bookmark.objects.get(id=bookmark_id, student=student)  # Pastikan bookmark milik pengguna  
+        bookmark = Bookmark.objects.get(id=bookmark_id, student_id=request.user.id)  # Pastikan bookmark milik pengguna  
     except Bookmark.DoesNotExist:  
         return Response({"error": "Bookmark not found."}, status=404)  
   
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class LmsCoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lms_core'
+
+    def ready(self):
+        from lms_core import signals  # noqa: F401
+        post_migrate.connect(install_search_index, sender=self)
+
+
+def install_search_index(sender, using, **kwargs):
+    # Di SQLite migrasi yang membuat ulang tabel ikut menghapus trigger FTS,
+    # jadi index full-text dipasang lagi (idempoten) setiap selesai migrate
+    from django.db import connections
+    from lms_core import search
+    search.install(connections[using])
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.functional import cached_property
+from jwt import PyJWTError
+from ninja.errors import AuthenticationError
+from ninja.security import HttpBearer
+from ninja_simple_jwt.jwt.token_operations import TokenTypes, decode_token
+
+
+class ClaimsUser:
+    """User ringan yang dibangun dari klaim access token tanpa query database.
+
+    Baris User lengkap baru dimuat (sekali per request) saat atribut .user diakses.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, claims):
+        self.claims = claims
+        self.id = self.pk = claims["user_id"]
+        self.username = claims.get("username", "")
+        self.email = claims.get("email", "")
+        self.first_name = claims.get("first_name", "")
+        self.last_name = claims.get("last_name", "")
+        self.is_staff = claims.get("is_staff", False)
+        self.is_superuser = claims.get("is_superuser", False)
+
+    @cached_property
+    def user(self):
+        return User.objects.get(id=self.id)
+
+    def __str__(self):
+        return self.username or str(self.id)
+
+    def __repr__(self):
+        return f"ClaimsUser(id={self.id})"
+
+
+class TokenCache:
+    """LRU berbatas untuk klaim access token yang sudah diverifikasi.
+
+    Kunci berupa sha256 token sehingga token mentah tidak disimpan; entri
+    kedaluwarsa bersamaan dengan klaim exp token itu sendiri.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token, claims):
+        exp = claims.get("exp")
+        if not self.maxsize or exp is None:
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (exp, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+token_cache = TokenCache(getattr(settings, "JWT_TOKEN_CACHE_SIZE", 1024))
+
+
+class JwtAuth(HttpBearer):
+    """Autentikasi JWT yang memasang ClaimsUser di request.user.
+
+    Token yang sama dalam satu sesi hanya diverifikasi signature-nya sekali,
+    selanjutnya klaimnya diambil dari token_cache.
+    """
+
+    def authenticate(self, request, token):
+        claims = token_cache.get(token)
+        if claims is None:
+            try:
+                claims = decode_token(token, token_type=TokenTypes.ACCESS, verify=True)
+            except PyJWTError as e:
+                raise AuthenticationError(status_code=401, message=f"Invalid or expired token: {e}") from e
+            token_cache.set(token, claims)
+        if not claims.get("user_id"):
+            raise AuthenticationError(status_code=401, message="Invalid token: missing user_id")
+
+        request.user = ClaimsUser(claims)
+        return request.user
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def dashboard_key(user_id):
+    return f"dashboard:{user_id}"
+
+
+def get_dashboard(user_id, compute):
+    # TTL hanya jaring pengaman; data dihapus lebih awal oleh signal saat ada perubahan
+    timeout = getattr(settings, "DASHBOARD_CACHE_TTL", 300)
+    return cache.get_or_set(dashboard_key(user_id), compute, timeout)
+
+
+def invalidate_dashboard(*user_ids):
+    cache.delete_many([dashboard_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+def member_key(course_id, user_id):
+    return f"members:{course_id}:{user_id}"
+
+
+def get_membership(course_id, user_id):
+    """(member_id, roles) bila user anggota course, selain itu None.
+
+    Satu entri kecil per (course, user), diisi dari index unik (course, user)
+    saat pertama dibutuhkan; bukan anggota juga di-cache.
+    """
+    from lms_core.models import CourseMember
+
+    key = member_key(course_id, user_id)
+    membership = cache.get(key)
+    if membership is None:
+        row = (CourseMember.objects.filter(course_id=course_id, user_id=user_id)
+               .values_list("id", "roles").first())
+        membership = tuple(row) if row else ()
+        cache.set(key, membership, getattr(settings, "MEMBERSHIP_CACHE_TTL", 300))
+    return membership or None
+
+
+def set_memberships(course_id, memberships):
+    """Isi cache sekaligus dari {user_id: (member_id, roles) atau None}."""
+    cache.set_many(
+        {member_key(course_id, user_id): tuple(membership or ())
+         for user_id, membership in memberships.items()},
+        getattr(settings, "MEMBERSHIP_CACHE_TTL", 300),
+    )
+
+
+def invalidate_membership(course_id, *user_ids):
+    # course tidak bisa dihapus selama masih punya anggota (RESTRICT), jadi cukup per user
+    cache.delete_many([member_key(course_id, user_id) for user_id in user_ids if user_id is not None])
+
+
+CATALOG_KEY = "catalog:version"
+
+
+def catalog_version():
+    """Waktu perubahan terakhir katalog course; dinaikkan oleh signal, tidak dihitung dari tabel."""
+    version = cache.get(CATALOG_KEY)
+    if version is None:
+        # entri hilang (restart/eviction): anggap katalog baru berubah supaya validator lama tidak cocok
+        cache.add(CATALOG_KEY, timezone.now(), None)
+        version = cache.get(CATALOG_KEY)
+    return version
+
+
+def bump_catalog():
+    cache.set(CATALOG_KEY, timezone.now(), None)
+
+
+def outline_key(course_id):
+    return f"outline:{course_id}"
+
+
+def get_outline(course_id, compute):
+    key = outline_key(course_id)
+    outline = cache.get(key)
+    if outline is None:
+        outline = compute()
+        # None (course tidak ada) tidak di-cache supaya course yang baru dibuat langsung terbaca
+        if outline is not None:
+            cache.set(key, outline, getattr(settings, "OUTLINE_CACHE_TTL", 3600))
+    return outline
+
+
+def invalidate_outline(*course_ids):
+    cache.delete_many([outline_key(course_id) for course_id in course_ids if course_id is not None])
@@ -0,0 +1,85 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+from ninja.decorators import decorate_view
+
+from lms_core.cache import catalog_version
+from lms_core.models import Course, CourseContent
+
+
+def conditional(state):
+    """Tambahkan ETag/Last-Modified dan penanganan If-None-Match ke endpoint GET.
+
+    `state(**path_params)` menjalankan satu query ringan dan mengembalikan tuple
+    yang diawali waktu update terakhir, atau None bila resource tidak ada. Bila
+    klien sudah memegang versi yang sama, endpoint membalas 304 tanpa menjalankan
+    query utama maupun serializer.
+    """
+    def get_state(request, **kwargs):
+        # etag_func dan last_modified_func dipanggil terpisah, hitung state sekali saja
+        if not hasattr(request, "_conditional_state"):
+            request._conditional_state = state(**kwargs)
+        return request._conditional_state
+
+    def etag(request, **kwargs):
+        current = get_state(request, **kwargs)
+        if current is None:
+            return None
+        # path lengkap ikut dihitung karena tiap halaman/query string berisi data berbeda
+        return hashlib.md5(f"{request.get_full_path()}|{current}".encode()).hexdigest()
+
+    def last_modified(request, **kwargs):
+        current = get_state(request, **kwargs)
+        return current[0] if current else None
+
+    def decorator(view):
+        conditioned = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        if not iscoroutinefunction(view):
+            return conditioned
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            # condition() memanggil fungsi etag secara sinkron; untuk view async state
+            # dihitung lebih dulu di thread terpisah lalu dibaca dari memo request
+            request._conditional_state = await sync_to_async(state)(**kwargs)
+            return await conditioned(request, *args, **kwargs)
+        return inner
+
+    return decorate_view(decorator)
+
+
+def catalog_state():
+    # Tanpa query: versi katalog dinaikkan signal course, rating dan varian gambar
+    return catalog_version(),
+
+
+def course_state(course_id):
+    state = (Course.objects.filter(id=course_id)
+             .values("updated_at", "stats__rating_updated_at").first())
+    if state is None:
+        return None
+    return max(filter(None, [state["updated_at"], state["stats__rating_updated_at"]])),
+
+
+def course_contents_state(course_id):
+    # Konten menyertakan data matkul, jadi perubahan matkul juga mengubah validator
+    state = (Course.objects.filter(id=course_id)
+             .annotate(content_updated=Max("coursecontent__updated_at"), total=Count("coursecontent"))
+             .values("updated_at", "content_updated", "total").first())
+    if state is None:
+        return None
+    updated = max(filter(None, [state["updated_at"], state["content_updated"]]))
+    return updated, state["total"]
+
+
+def content_state(course_id, content_id):
+    state = (CourseContent.objects.filter(id=content_id)
+             .values("updated_at", "course_id__updated_at").first())
+    if state is None:
+        return None
+    return max(state["updated_at"], state["course_id__updated_at"]),
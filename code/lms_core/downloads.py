@@ -0,0 +1,126 @@
+"""Pengiriman file lampiran konten dengan dukungan Range dan header kondisional."""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeReader:
+    """Batasi pembacaan file ke `length` byte mulai dari posisi saat ini."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inklusif untuk satu rentang byte, None bila header diabaikan, False bila tidak valid."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # multi-range atau unit lain: kirim file utuh
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return False
+    if not start:
+        # suffix range: N byte terakhir
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def serve_attachment(request, name):
+    """Kirim file storage `name`.
+
+    Bila ATTACHMENT_ACCEL_REDIRECT_PREFIX diset, file diserahkan ke proxy depan
+    (nginx X-Accel-Redirect) yang menangani Range/sendfile sendiri. Selain itu
+    file dikirim dengan FileResponse (memakai wsgi.file_wrapper/sendfile bila
+    server mendukung) beserta ETag, Last-Modified, dan Range satu rentang.
+    """
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    filename = os.path.basename(name)
+
+    prefix = getattr(settings, "ATTACHMENT_ACCEL_REDIRECT_PREFIX", None)
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + name.lstrip("/")
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+        return response
+
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        # storage non-lokal (mis. object storage): arahkan ke URL storage itu
+        return HttpResponseRedirect(default_storage.url(name))
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    size = stat.st_size
+    etag = quote_etag(f"{size:x}-{int(stat.st_mtime):x}")
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    byte_range = None
+    if "HTTP_RANGE" in request.META and if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META["HTTP_RANGE"], size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        # rentang sampai akhir file tetap memakai file asli agar sendfile bisa dipakai
+        body = file if end == size - 1 else RangeReader(file, end - start + 1)
+        response = FileResponse(body, status=206, content_type=content_type)
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """Range hanya berlaku bila If-Range (jika ada) masih cocok dengan versi file."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
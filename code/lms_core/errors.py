@@ -0,0 +1,11 @@
+class ApiError(Exception):
+    """Error yang dirender sebagai {"error": message} oleh handler apiv1.
+
+    Dipakai di view yang dibungkus decorator (mis. paginate) sehingga
+    tidak bisa mengembalikan Response error secara langsung.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
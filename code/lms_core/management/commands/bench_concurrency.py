@@ -0,0 +1,94 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from ninja_simple_jwt.jwt.token_operations import get_access_token_for_user
+
+from lms_core.models import Course
+
+
+class Command(BaseCommand):
+    help = ("Uji beban endpoint baca dengan banyak klien bersamaan. Jalankan sekali terhadap server "
+            "WSGI (runserver/gunicorn) dan sekali terhadap server ASGI (uvicorn), lalu bandingkan")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help="alamat server yang diuji (default: %(default)s)")
+        parser.add_argument('--clients', type=int, default=500,
+                            help="jumlah klien bersamaan (default: %(default)s)")
+        parser.add_argument('--requests', type=int, default=5000,
+                            help="total request (default: %(default)s)")
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        paths, token = self.build_paths()
+        target = urlsplit(options['url'])
+        if target.scheme != 'http':
+            raise CommandError("hanya http:// yang didukung")
+
+        started = time.perf_counter()
+        results = asyncio.run(self.run(target, paths, token, options))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(ms for ok, ms in results if ok)
+        errors = sum(1 for ok, _ in results if not ok)
+        if not latencies:
+            raise CommandError(f"semua {errors} request gagal, pastikan server berjalan di {options['url']}")
+
+        def pct(p):
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+        self.stdout.write(f"{options['clients']} klien, {len(results)} request dalam {elapsed:.2f} s")
+        self.stdout.write(f"  throughput {len(latencies) / elapsed:.1f} req/s, gagal {errors}")
+        self.stdout.write(f"  latensi p50 {statistics.median(latencies):.1f} ms, "
+                          f"p95 {pct(0.95):.1f} ms, p99 {pct(0.99):.1f} ms")
+
+    def build_paths(self):
+        # course dengan konten terbanyak sebagai target endpoint detail
+        course = Course.objects.annotate(total=Count('coursecontent')).order_by('-total').first()
+        if course is None:
+            raise CommandError("belum ada data course, jalankan importer terlebih dahulu")
+        token, _ = get_access_token_for_user(course.teacher)
+        paths = [
+            '/api/v1/courses',
+            f'/api/v1/courses/{course.id}',
+            f'/api/v1/courses/{course.id}/contents',
+            f'/api/v1/courses/{course.id}/announcements',
+            f'/api/v1/courses/{course.id}/feedback',
+        ]
+        return paths, token
+
+    async def run(self, target, paths, token, options):
+        semaphore = asyncio.Semaphore(options['clients'])
+
+        async def one(i):
+            async with semaphore:
+                path = paths[i % len(paths)]
+                start = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(self.get(target, path, token), options['timeout'])
+                    ok = status == 200
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                    # koneksi ditutup tanpa jawaban atau status line rusak: hitung sebagai gagal
+                    ok = False
+                return ok, (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(one(i) for i in range(options['requests'])))
+
+    async def get(self, target, path, token):
+        # klien HTTP/1.1 minimal agar benchmark tidak butuh dependensi tambahan
+        reader, writer = await asyncio.open_connection(target.hostname, target.port or 80)
+        try:
+            writer.write((
+                f"GET {path} HTTP/1.1\r\nHost: {target.netloc}\r\n"
+                f"Authorization: Bearer {token}\r\nConnection: close\r\n\r\n"
+            ).encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
@@ -0,0 +1,164 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+
+from lms_core.models import Announcement, Bookmark, Comment, Course, CourseContent, CourseMember, Feedback
+from lms_core.utils import chunked
+
+# model yang index/constraint di Meta-nya diukur oleh benchmark ini
+INDEXED_MODELS = [CourseMember, Comment, Feedback, Bookmark, Announcement]
+
+
+class Command(BaseCommand):
+    help = "Bandingkan rencana query dan latensi lookup utama tanpa dan dengan index komposit"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="tambahkan kira-kira N baris data dummy sebelum benchmark (mis. 10000000)")
+        parser.add_argument('--repeat', type=int, default=200,
+                            help="jumlah eksekusi per query (default: %(default)s)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['batch_size'])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        queries = self.build_queries(options['repeat'])
+        self.stdout.write(self.style.MIGRATE_HEADING("== tanpa index komposit"))
+        with self.without_indexes():
+            before = self.run_queries(queries)
+        self.stdout.write(self.style.MIGRATE_HEADING("== dengan index komposit"))
+        after = self.run_queries(queries)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== ringkasan (median ms)"))
+        for name in before:
+            self.stdout.write(f"{name:<24} {before[name]:>10.3f} -> {after[name]:>10.3f}")
+
+    def build_queries(self, repeat):
+        members = self.sample(CourseMember, ('course_id', 'user_id'), repeat)
+        content_ids = [row[0] for row in self.sample(CourseContent, ('id',), repeat)]
+        course_ids = [row[0] for row in self.sample(Course, ('id',), repeat)]
+        bookmarks = self.sample(Bookmark, ('student_id', 'content_id'), repeat)
+        # (nama, daftar kunci, pembuat queryset, cukup exists()?)
+        return [
+            ('is_member', members,
+             lambda key: CourseMember.objects.filter(course_id=key[0], user_id=key[1]), True),
+            ('content_comments', content_ids,
+             lambda key: Comment.objects.filter(content_id=key).order_by('-created_at')[:20], False),
+            ('course_feedback', course_ids,
+             lambda key: Feedback.objects.filter(course_id=key).order_by('-created_at')[:20], False),
+            ('bookmark_lookup', bookmarks,
+             lambda key: Bookmark.objects.filter(student_id=key[0], content_id=key[1]), True),
+            ('course_announcements', course_ids,
+             lambda key: Announcement.objects.filter(course_id=key).order_by('-date_announcement')[:20], False),
+        ]
+
+    def run_queries(self, queries):
+        medians = {}
+        for name, keys, make_queryset, exists in queries:
+            if not keys:
+                self.stdout.write(f"{name}: tidak ada data, dilewati")
+                continue
+            self.stdout.write(self.style.SQL_KEYWORD(name))
+            self.stdout.write(make_queryset(keys[0]).explain())
+
+            timings = []
+            for key in keys:
+                queryset = make_queryset(key)
+                start = time.perf_counter()
+                queryset.exists() if exists else list(queryset)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            medians[name] = statistics.median(timings)
+            p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+            self.stdout.write(f"  {len(timings)} query, median {medians[name]:.3f} ms, p95 {p95:.3f} ms\n")
+        return medians
+
+    @contextmanager
+    def without_indexes(self):
+        # lepas sementara index/constraint dari Meta, kembalikan lagi apa pun hasilnya
+        with connection.schema_editor(atomic=False) as editor:
+            for model in INDEXED_MODELS:
+                for constraint in model._meta.constraints:
+                    editor.remove_constraint(model, constraint)
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+        try:
+            yield
+        finally:
+            with connection.schema_editor(atomic=False) as editor:
+                for model in INDEXED_MODELS:
+                    for constraint in model._meta.constraints:
+                        editor.add_constraint(model, constraint)
+                    for index in model._meta.indexes:
+                        editor.add_index(model, index)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+    def sample(self, model, fields, count):
+        bounds = model.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return []
+        ids = {random.randint(bounds['low'], bounds['high']) for _ in range(count * 2)}
+        return list(model.objects.filter(id__in=ids).values_list(*fields)[:count])
+
+    def seed(self, rows, batch_size):
+        """Isi data dummy dengan proporsi kira-kira seperti produksi: sebagian besar komentar."""
+        user_count = max(rows // 200, 10)
+        course_count = max(rows // 2000, 5)
+        members_per_course = max(rows * 15 // 100 // course_count, 1)
+        content_count = max(rows * 2 // 100, 1)
+        comment_count = rows * 70 // 100
+        feedback_count = rows * 5 // 100
+        bookmark_count = rows * 5 // 100
+        announcement_count = rows * 3 // 100
+
+        def write(model, objs):
+            total = 0
+            for batch in chunked(objs, batch_size):
+                model.objects.bulk_create(batch)
+                total += len(batch)
+            self.stdout.write(f"seed {model.__name__}: {total} baris")
+
+        prefix = f"bench{int(time.time())}"
+        write(User, (User(username=f"{prefix}-{i}", password='!') for i in range(user_count)))
+        user_ids = list(User.objects.filter(username__startswith=f"{prefix}-").values_list('id', flat=True))
+
+        write(Course, (Course(name=f"{prefix} course {i}", description='-', price=0,
+                              teacher_id=random.choice(user_ids)) for i in range(course_count)))
+        course_ids = list(Course.objects.filter(name__startswith=f"{prefix} course").values_list('id', flat=True))
+
+        members_per_course = min(members_per_course, len(user_ids))
+        write(CourseMember, (CourseMember(course_id_id=course_id, user_id_id=user_id)
+                             for course_id in course_ids
+                             for user_id in random.sample(user_ids, members_per_course)))
+        members = {}
+        for member_id, course_id in CourseMember.objects.filter(course_id__in=course_ids).values_list('id', 'course_id'):
+            members.setdefault(course_id, []).append(member_id)
+
+        write(CourseContent, (CourseContent(name=f"{prefix} content {i}", course_id_id=random.choice(course_ids))
+                              for i in range(content_count)))
+        contents = list(CourseContent.objects.filter(course_id__in=course_ids).values_list('id', 'course_id'))
+
+        def comments():
+            for _ in range(comment_count):
+                content_id, course_id = random.choice(contents)
+                yield Comment(content_id_id=content_id, member_id_id=random.choice(members[course_id]), comment='-')
+        write(Comment, comments())
+
+        write(Feedback, (Feedback(course_id=random.choice(course_ids), student_id=random.choice(user_ids),
+                                  rating=random.randint(1, 5), comments='-') for _ in range(feedback_count)))
+        write(Bookmark, (Bookmark(student_id=random.choice(user_ids), content_id=random.choice(contents)[0])
+                         for _ in range(bookmark_count)))
+        write(Announcement, (Announcement(course_id=random.choice(course_ids), teacher_id=random.choice(user_ids),
+                                          title='-', content='-') for _ in range(announcement_count)))
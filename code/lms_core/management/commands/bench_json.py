@@ -0,0 +1,65 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from ninja.renderers import JSONRenderer
+
+from lms_core.models import Course, CourseContent
+from lms_core.renderers import ORJSONRenderer, orjson
+from lms_core.schema import CourseContentMini
+
+
+class Command(BaseCommand):
+    help = "Bandingkan waktu serialisasi respons list_content_course antara json bawaan dan orjson"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contents', type=int, default=3000,
+                            help="jumlah konten pada course uji (default: %(default)s)")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson belum terpasang (pip install orjson)")
+
+        # data uji dibuat di dalam transaksi lalu di-rollback, database tidak berubah
+        with transaction.atomic():
+            data = self.build_payload(options['contents'])
+            transaction.set_rollback(True)
+
+        renderers = [('json', JSONRenderer()), ('orjson', ORJSONRenderer())]
+        results = {}
+        for name, renderer in renderers:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(None, data, response_status=200)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(timings)
+            self.stdout.write(f"{name:<8} render median {results[name]:8.2f} ms, {len(body):,} byte")
+
+        body = JSONRenderer().render(None, data, response_status=200)
+        for name, loads in [('json', json.loads), ('orjson', orjson.loads)]:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                loads(body)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{name:<8} parse  median {statistics.median(timings):8.2f} ms")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"orjson {results['json'] / results['orjson']:.1f}x lebih cepat untuk {len(data)} konten"
+        ))
+
+    def build_payload(self, count):
+        teacher = User.objects.create_user(username='bench-json-teacher')
+        course = Course.objects.create(name="Bench JSON", description="-", price=0, teacher=teacher)
+        CourseContent.objects.bulk_create(
+            CourseContent(course_id=course, name=f"Konten {i}", description="Deskripsi konten " * 10)
+            for i in range(count)
+        )
+        # bentuk data sama seperti yang diserahkan ninja ke renderer setelah validasi schema
+        contents = CourseContent.objects.filter(course_id=course).select_related('course_id__teacher')
+        return [CourseContentMini.from_orm(content).model_dump() for content in contents]
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from lms_core.models import CourseStats
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang tabel statistik matkul (anggota, konten, komentar, umpan balik) dari awal"
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int,
+                            help="hanya matkul dengan id ini (default: semua matkul)")
+
+    def handle(self, *args, **options):
+        stats = CourseStats.rebuild(options['course_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f"Statistik {len(stats)} matkul diperbarui"))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_members(apps, schema_editor):
+    # Data lama bisa berisi pasangan (course, user) ganda; pindahkan komentarnya ke
+    # baris dengan id terkecil lalu hapus sisanya sebelum constraint unik dipasang
+    CourseMember = apps.get_model('lms_core', 'CourseMember')
+    Comment = apps.get_model('lms_core', 'Comment')
+    duplicates = (CourseMember.objects.values('course_id', 'user_id')
+                  .annotate(keep_id=Min('id'), total=Count('id'))
+                  .filter(total__gt=1))
+    for duplicate in duplicates:
+        extra = (CourseMember.objects
+                 .filter(course_id=duplicate['course_id'], user_id=duplicate['user_id'])
+                 .exclude(id=duplicate['keep_id']))
+        Comment.objects.filter(member_id__in=extra).update(member_id=duplicate['keep_id'])
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0007_bookmark'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_members, migrations.RunPython.noop),
+    ]
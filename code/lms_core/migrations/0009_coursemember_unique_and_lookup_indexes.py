@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0008_merge_duplicate_coursemembers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['course', '-date_announcement'], name='announcement_course_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['student', 'content'], name='bookmark_student_content_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_id', 'created_at'], name='comment_content_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['course', 'created_at'], name='feedback_course_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='coursemember',
+            constraint=models.UniqueConstraint(fields=('course_id', 'user_id'), name='unique_course_member'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0009_coursemember_unique_and_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='lms_core.course', verbose_name='matkul')),
+                ('members_count', models.PositiveIntegerField(default=0, verbose_name='jumlah anggota')),
+                ('content_count', models.PositiveIntegerField(default=0, verbose_name='jumlah konten')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='jumlah komentar')),
+                ('feedback_count', models.PositiveIntegerField(default=0, verbose_name='jumlah umpan balik')),
+            ],
+            options={
+                'verbose_name': 'Statistik Matkul',
+                'verbose_name_plural': 'Statistik Matkul',
+            },
+        ),
+    ]
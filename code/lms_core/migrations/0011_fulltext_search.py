@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from lms_core import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor.connection)
+    search.rebuild(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0010_coursestats'),
+    ]
+
+    # DDL khusus vendor (tsvector + GIN di PostgreSQL, FTS5 + trigger di SQLite),
+    # backend lain dilewati oleh lms_core.search
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
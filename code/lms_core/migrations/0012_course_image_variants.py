@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0011_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Varian gambar'),
+        ),
+    ]
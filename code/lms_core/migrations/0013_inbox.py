@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0012_course_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Inbox',
+                'verbose_name_plural': 'Inbox',
+            },
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='fanned_out',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='announcement',
+            name='date_announcement',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='inboxitem',
+            name='announcement',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to='lms_core.announcement'),
+        ),
+        migrations.AddField(
+            model_name='inboxitem',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='inboxitem',
+            constraint=models.UniqueConstraint(fields=('user', 'announcement'), name='unique_inbox_item'),
+        ),
+    ]
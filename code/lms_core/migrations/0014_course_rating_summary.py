@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0013_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating 1'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating 2'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating 3'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating 4'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating 5'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_mean',
+            field=models.FloatField(blank=True, null=True, verbose_name='rata-rata rating'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_sum',
+            field=models.IntegerField(default=0, verbose_name='total rating'),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='rating diperbarui'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['rating_mean'], name='coursestats_rating_mean_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:54
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_announcement_dates(apps, schema_editor):
+    InboxItem = apps.get_model('lms_core', 'InboxItem')
+    Announcement = apps.get_model('lms_core', 'Announcement')
+    InboxItem.objects.update(date_announcement=Subquery(
+        Announcement.objects.filter(id=OuterRef('announcement_id')).values('date_announcement')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0014_course_rating_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboxitem',
+            name='date_announcement',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='inboxitem',
+            index=models.Index(fields=['user', '-date_announcement', '-announcement'], name='inbox_user_date_idx'),
+        ),
+        migrations.RunPython(copy_announcement_dates, migrations.RunPython.noop),
+    ]
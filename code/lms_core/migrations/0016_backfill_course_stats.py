@@ -0,0 +1,59 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_course_stats(apps, schema_editor):
+    # 0010 tidak membuat baris statistik untuk matkul lama dan 0014 menambah kolom
+    # rating; hitung ulang semua matkul dengan cara yang sama seperti CourseStats.rebuild
+    Course = apps.get_model('lms_core', 'Course')
+    CourseStats = apps.get_model('lms_core', 'CourseStats')
+    CourseMember = apps.get_model('lms_core', 'CourseMember')
+    CourseContent = apps.get_model('lms_core', 'CourseContent')
+    Comment = apps.get_model('lms_core', 'Comment')
+    Feedback = apps.get_model('lms_core', 'Feedback')
+
+    now = timezone.now()
+
+    def grouped(queryset, course_field):
+        rows = queryset.values(course_field).annotate(total=Count('id')).order_by()
+        return {row[course_field]: row['total'] for row in rows}
+
+    members = grouped(CourseMember.objects, 'course_id')
+    contents = grouped(CourseContent.objects, 'course_id')
+    comments = grouped(Comment.objects, 'content_id__course_id')
+    stats = {course_id: CourseStats(course_id=course_id,
+                                    members_count=members.get(course_id, 0),
+                                    content_count=contents.get(course_id, 0),
+                                    comments_count=comments.get(course_id, 0),
+                                    rating_updated_at=now)
+             for course_id in Course.objects.values_list('id', flat=True)}
+
+    ratings = Feedback.objects.values('course_id', 'rating').annotate(total=Count('id')).order_by()
+    for row in ratings:
+        course_stats = stats[row['course_id']]
+        field = f"rating_{min(max(row['rating'], 1), 5)}"
+        setattr(course_stats, field, getattr(course_stats, field) + row['total'])
+        course_stats.feedback_count += row['total']
+        course_stats.rating_sum += row['rating'] * row['total']
+    for course_stats in stats.values():
+        if course_stats.feedback_count:
+            course_stats.rating_mean = course_stats.rating_sum / course_stats.feedback_count
+
+    CourseStats.objects.bulk_create(
+        list(stats.values()), batch_size=1000, update_conflicts=True, unique_fields=['course'],
+        update_fields=['members_count', 'content_count', 'comments_count', 'feedback_count',
+                       'rating_sum', 'rating_mean', 'rating_1', 'rating_2', 'rating_3',
+                       'rating_4', 'rating_5', 'rating_updated_at'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0015_inbox_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+from django.db.models import Count, F, FloatField
+from django.db.models.functions import Cast, NullIf
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -7,6 +10,8 @@ class Course(models.Model):
     description = models.TextField("Deskripsi")
     price = models.IntegerField("Harga")
     image = models.ImageField("Gambar", upload_to="course", blank=True, null=True)
+    # {lebar: path file} hasil lms_core.tasks.generate_course_image_variants
+    image_variants = models.JSONField("Varian gambar", default=dict, blank=True)
     teacher = models.ForeignKey(User, verbose_name="Pengajar", on_delete=models.RESTRICT)
     created_at = models.DateTimeField("Dibuat pada", auto_now_add=True)
     updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
@@ -20,7 +25,9 @@ class Course(models.Model):
         ordering = ["-created_at"]
 
     def is_member(self, user):
-        return CourseMember.objects.filter(course_id=self, user_id=user).exists()
+        # dijawab dari cache keanggotaan per course (lms_core/cache.py)
+        from lms_core.cache import get_membership
+        return get_membership(self.pk, getattr(user, "pk", user)) is not None
 
 ROLE_OPTIONS = [('std', "Siswa"), ('ast', "Asisten")]
 
@@ -34,6 +41,10 @@ class CourseMember(models.Model):
     class Meta:
         verbose_name = "Subscriber Matkul"
         verbose_name_plural = "Subscriber Matkul"
+        constraints = [
+            # satu user hanya boleh terdaftar sekali per matkul, juga dipakai untuk cek keanggotaan
+            models.UniqueConstraint(fields=["course_id", "user_id"], name="unique_course_member"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.id} {self.course_id} : {self.user_id}"
@@ -67,6 +78,9 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Komentar"
         verbose_name_plural = "Komentar"
+        indexes = [
+            models.Index(fields=["content_id", "created_at"], name="comment_content_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return "Komen: "+self.member_id.user_id+"-"+self.comment
@@ -78,7 +92,9 @@ class Announcement(models.Model):
     title = models.CharField(max_length=255)  
     content = models.TextField()  
     date_created = models.DateTimeField(auto_now_add=True)  
-    date_announcement = models.DateTimeField(auto_now_add=True)    # Tanggal pengumuman akan muncul  
+    date_announcement = models.DateTimeField(default=timezone.now)    # Tanggal pengumuman akan muncul  
+    # True bila sudah disalin ke InboxItem setiap anggota (fan-out on write)
+    fanned_out = models.BooleanField(default=False)
   
     def __str__(self):  
         return self.title  
@@ -87,6 +103,33 @@ class Announcement(models.Model):
         verbose_name = "Pengumuman"  
         verbose_name_plural = "Pengumuman"  
         ordering = ["-date_announcement"]  
+        indexes = [
+            models.Index(fields=["course", "-date_announcement"], name="announcement_course_date_idx"),
+        ]
+
+
+class InboxItem(models.Model):
+    """Salinan pengumuman di inbox seorang siswa.
+
+    Hanya dibuat untuk course kecil (fan-out on write, lihat lms_core.tasks);
+    pengumuman course besar digabung saat inbox dibaca.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="inbox_items")
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name="inbox_items")
+    # Salinan Announcement.date_announcement agar inbox bisa dipaginasi langsung dari index
+    date_announcement = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Inbox"
+        verbose_name_plural = "Inbox"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "announcement"], name="unique_inbox_item"),
+        ]
+        indexes = [
+            # urutan sama dengan Announcement (tanggal, id) supaya bisa digabung per cursor
+            models.Index(fields=["user", "-date_announcement", "-announcement"], name="inbox_user_date_idx"),
+        ]
 
 
 class Feedback(models.Model):  
@@ -96,8 +139,129 @@ class Feedback(models.Model):
     comments = models.TextField(blank=True, null=True)  
     created_at = models.DateTimeField(auto_now_add=True)  
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["course", "created_at"], name="feedback_course_created_idx"),
+        ]
+
 
 class Bookmark(models.Model):  
     student = models.ForeignKey(User, on_delete=models.RESTRICT)  
     content = models.ForeignKey(CourseContent, on_delete=models.RESTRICT)  
-    created_at = models.DateTimeField(auto_now_add=True)  
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)  
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "content"], name="bookmark_student_content_idx"),
+        ]
+
+
+class CourseStats(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True,
+                                  related_name="stats", verbose_name="matkul")
+    members_count = models.PositiveIntegerField("jumlah anggota", default=0)
+    content_count = models.PositiveIntegerField("jumlah konten", default=0)
+    comments_count = models.PositiveIntegerField("jumlah komentar", default=0)
+    feedback_count = models.PositiveIntegerField("jumlah umpan balik", default=0)
+    # Ringkasan rating dari Feedback; jumlah rating = feedback_count
+    rating_sum = models.IntegerField("total rating", default=0)
+    rating_mean = models.FloatField("rata-rata rating", null=True, blank=True)
+    rating_1 = models.PositiveIntegerField("rating 1", default=0)
+    rating_2 = models.PositiveIntegerField("rating 2", default=0)
+    rating_3 = models.PositiveIntegerField("rating 3", default=0)
+    rating_4 = models.PositiveIntegerField("rating 4", default=0)
+    rating_5 = models.PositiveIntegerField("rating 5", default=0)
+    # Dipakai validator ETag katalog/detail matkul
+    rating_updated_at = models.DateTimeField("rating diperbarui", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Statistik Matkul"
+        verbose_name_plural = "Statistik Matkul"
+        indexes = [
+            models.Index(fields=["rating_mean"], name="coursestats_rating_mean_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Statistik {self.course_id}"
+
+    @classmethod
+    def increment(cls, course_id, field, delta=1):
+        # Perbarui penghitung secara atomik; bila barisnya belum ada, hitung ulang dari awal
+        if not cls.objects.filter(course_id=course_id).update(**{field: F(field) + delta}):
+            cls.rebuild([course_id])
+
+    @staticmethod
+    def rating_field(rating):
+        # Rating di luar 1-5 (data lama) masuk ke ember terdekat
+        return f"rating_{min(max(rating, 1), 5)}"
+
+    @property
+    def rating_histogram(self):
+        return {str(rating): getattr(self, f"rating_{rating}") for rating in range(1, 6)}
+
+    @classmethod
+    def update_rating(cls, course_id, old=None, new=None):
+        """Terapkan satu perubahan rating secara atomik: tambah (old=None), ubah, atau hapus (new=None)."""
+        count = (new is not None) - (old is not None)
+        total = (new or 0) - (old or 0)
+        buckets = {}
+        if old is not None:
+            buckets[cls.rating_field(old)] = buckets.get(cls.rating_field(old), 0) - 1
+        if new is not None:
+            buckets[cls.rating_field(new)] = buckets.get(cls.rating_field(new), 0) + 1
+
+        # rating_mean ditulis pertama dan dihitung dari nilai lama + selisih, jadi tidak
+        # bergantung pada urutan evaluasi SET di database
+        changes = {
+            "rating_mean": Cast(F("rating_sum") + total, FloatField()) / NullIf(F("feedback_count") + count, 0),
+            "feedback_count": F("feedback_count") + count,
+            "rating_sum": F("rating_sum") + total,
+            "rating_updated_at": timezone.now(),
+        }
+        changes.update({field: F(field) + delta for field, delta in buckets.items() if delta})
+        if not cls.objects.filter(course_id=course_id).update(**changes):
+            cls.rebuild([course_id])
+
+    @classmethod
+    def rebuild(cls, course_ids=None):
+        """Hitung ulang statistik dari tabel sumber untuk course_ids (atau semua matkul)."""
+        courses = Course.objects.all()
+        if course_ids is not None:
+            courses = courses.filter(id__in=course_ids)
+        course_ids = list(courses.values_list("id", flat=True))
+
+        def grouped(queryset, course_field):
+            rows = (queryset.filter(**{f"{course_field}__in": course_ids})
+                    .values(course_field).annotate(total=Count("id")).order_by())
+            return {row[course_field]: row["total"] for row in rows}
+
+        members = grouped(CourseMember.objects, "course_id")
+        contents = grouped(CourseContent.objects, "course_id")
+        comments = grouped(Comment.objects, "content_id__course_id")
+        feedback = grouped(Feedback.objects, "course_id")
+        stats = {course_id: cls(course_id=course_id,
+                                members_count=members.get(course_id, 0),
+                                content_count=contents.get(course_id, 0),
+                                comments_count=comments.get(course_id, 0),
+                                feedback_count=feedback.get(course_id, 0),
+                                rating_updated_at=timezone.now())
+                 for course_id in course_ids}
+
+        ratings = (Feedback.objects.filter(course_id__in=course_ids)
+                   .values("course_id", "rating").annotate(total=Count("id")).order_by())
+        for row in ratings:
+            course_stats = stats[row["course_id"]]
+            field = cls.rating_field(row["rating"])
+            setattr(course_stats, field, getattr(course_stats, field) + row["total"])
+            course_stats.rating_sum += row["rating"] * row["total"]
+        for course_stats in stats.values():
+            if course_stats.feedback_count:
+                course_stats.rating_mean = course_stats.rating_sum / course_stats.feedback_count
+
+        return cls.objects.bulk_create(
+            list(stats.values()), update_conflicts=True, unique_fields=["course"],
+            update_fields=["members_count", "content_count", "comments_count", "feedback_count",
+                           "rating_sum", "rating_mean", "rating_1", "rating_2", "rating_3",
+                           "rating_4", "rating_5", "rating_updated_at"],
+        )
+
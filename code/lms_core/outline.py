@@ -0,0 +1,61 @@
+from django.db import connection
+
+from lms_core.models import CourseContent
+
+# Backend yang mendukung WITH RECURSIVE; lainnya memakai query datar biasa
+RECURSIVE_CTE_VENDORS = ("postgresql", "sqlite")
+
+
+def outline_rows(course_id):
+    """Semua konten course yang tersambung ke akar, diurutkan per kedalaman, dalam satu query."""
+    if connection.vendor not in RECURSIVE_CTE_VENDORS:
+        return list(CourseContent.objects.filter(course_id=course_id).order_by("id"))
+
+    opts = CourseContent._meta
+    table = connection.ops.quote_name(opts.db_table)
+    course_col = opts.get_field("course_id").column
+    parent_col = opts.get_field("parent_id").column
+    sql = f"""
+        WITH RECURSIVE outline (id, depth) AS (
+            SELECT id, 0 FROM {table}
+            WHERE {course_col} = %s AND {parent_col} IS NULL
+            UNION ALL
+            SELECT child.id, outline.depth + 1
+            FROM {table} child JOIN outline ON child.{parent_col} = outline.id
+        )
+        SELECT content.id, content.name, content.description, content.video_url,
+               content.{parent_col}, outline.depth FROM outline
+        JOIN {table} content ON content.id = outline.id
+        ORDER BY outline.depth, content.id
+    """
+    return list(CourseContent.objects.raw(sql, [course_id]))
+
+
+def build_outline(rows):
+    """Susun baris datar menjadi pohon bersarang; induk selalu diproses sebelum anaknya."""
+    nodes = {}
+    roots = []
+    pending = list(rows)
+    while pending:
+        remaining = []
+        for content in pending:
+            node = {
+                "id": content.id,
+                "name": content.name,
+                "description": content.description,
+                "video_url": content.video_url,
+                "children": [],
+            }
+            if content.parent_id_id is None:
+                roots.append(node)
+            elif content.parent_id_id in nodes:
+                nodes[content.parent_id_id]["children"].append(node)
+            else:
+                remaining.append(content)
+                continue
+            nodes[content.id] = node
+        # query datar tidak terurut per kedalaman; sisa yang induknya tidak pernah muncul dibuang
+        if len(remaining) == len(pending):
+            break
+        pending = remaining
+    return roots
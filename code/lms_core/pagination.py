@@ -0,0 +1,160 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from ninja import Field, Schema
+from ninja.pagination import AsyncPaginationBase
+
+from .errors import ApiError
+
+
+def estimate_count(queryset):
+    """Perkiraan jumlah baris queryset.
+
+    Di PostgreSQL memakai estimasi planner (EXPLAIN) sehingga tidak ada
+    COUNT(*) penuh; di database lain jatuh ke COUNT(*) biasa.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(AsyncPaginationBase):
+    """Paginasi keyset (cursor) berdasarkan (created_at, id).
+
+    Halaman berikutnya diambil dengan WHERE (created_at, id) < cursor,
+    bukan OFFSET, sehingga halaman jauh sama murahnya dengan halaman pertama.
+    Cursor berupa token base64 yang tidak perlu dipahami klien.
+
+    View boleh mengembalikan queryset yang sudah di-order_by() (mis. urutan
+    pilihan klien); urutan itu yang dipakai sebagai kunci. Kolom kunci boleh
+    berupa annotation, asalkan tidak NULL dan diakhiri kolom unik.
+
+    View juga boleh mengembalikan list beberapa queryset yang urutannya searah
+    dan kuncinya setara posisi demi posisi (mis. inbox: salinan fan-out dan
+    pengumuman course besar). Tiap sumber mengambil paling banyak page_size+1
+    baris dari index-nya sendiri, lalu hasilnya digabung; cursor berlaku untuk
+    semua sumber.
+    """
+
+    class Input(Schema):
+        cursor: Optional[str] = None
+        page_size: Optional[int] = Field(None, ge=1)
+        estimate_total: bool = False
+
+    # Field daftar item ditambahkan ninja sesuai items_attribute
+    class Output(Schema):
+        next_cursor: Optional[str] = None
+        estimated_total: Optional[int] = None
+
+    def __init__(self, *, ordering=("-created_at", "-id"), page_size=20,
+                 max_page_size=100, items_attribute="items", **kwargs):
+        super().__init__(**kwargs)
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.items_attribute = items_attribute
+
+    @staticmethod
+    def keys_for(ordering):
+        return [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+    @staticmethod
+    def key_value(item, name):
+        return item[name] if isinstance(item, dict) else getattr(item, name)
+
+    def encode_cursor(self, item, keys):
+        values = []
+        for name, _ in keys:
+            value = self.key_value(item, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, token, queryset, keys):
+        annotations = queryset.query.annotations
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError(token)
+            return [
+                (annotations[name].output_field if name in annotations
+                 else queryset.model._meta.get_field(name)).to_python(value)
+                for (name, _), value in zip(keys, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError, FieldDoesNotExist):
+            raise ApiError("Invalid cursor.", status=400)
+
+    def after(self, keys, values):
+        """Kondisi "sesudah cursor" untuk urutan multi-kolom."""
+        condition = Q()
+        equal = Q()
+        for (name, desc), value in zip(keys, values):
+            lookup = "lt" if desc else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        # Batas kolom pertama agar index range scan tetap bisa dipakai
+        first, desc = keys[0]
+        bound = Q(**{f"{first}__{'lte' if desc else 'gte'}": values[0]})
+        return bound & condition
+
+    def prepare(self, queryset, pagination):
+        """(queryset, halaman, kunci) untuk setiap sumber beserta ukuran halaman."""
+        page_size = min(pagination.page_size or self.page_size, self.max_page_size)
+        sources = []
+        for source in queryset if isinstance(queryset, (list, tuple)) else [queryset]:
+            ordering = source.query.order_by or self.ordering
+            keys = self.keys_for(ordering)
+            source = source.order_by(*ordering)
+            page = source
+            if pagination.cursor:
+                page = source.filter(self.after(keys, self.decode_cursor(pagination.cursor, source, keys)))
+            sources.append((source, page[:page_size + 1], keys))
+        return sources, page_size
+
+    def build(self, pages, page_size, total):
+        """pages: list (item, kunci) per sumber; beberapa sumber digabung menurut nilai kuncinya."""
+        if len(pages) == 1:
+            items, keys = pages[0]
+            keyed = [(item, keys) for item in items]
+        else:
+            keyed = [(item, keys) for items, keys in pages for item in items]
+            keyed.sort(key=lambda pair: [self.key_value(pair[0], name) for name, _ in pair[1]],
+                       reverse=pages[0][1][0][1])
+        next_cursor = None
+        if len(keyed) > page_size:
+            keyed = keyed[:page_size]
+            next_cursor = self.encode_cursor(*keyed[-1])
+        return {
+            self.items_attribute: [item for item, _ in keyed],
+            "next_cursor": next_cursor,
+            "estimated_total": total,
+        }
+
+    def paginate_queryset(self, queryset, pagination: Input, request, **params) -> Any:
+        sources, page_size = self.prepare(queryset, pagination)
+        total = sum(estimate_count(source) for source, _, _ in sources) if pagination.estimate_total else None
+        return self.build([(list(page), keys) for _, page, keys in sources], page_size, total)
+
+    async def apaginate_queryset(self, queryset, pagination: Input, request, **params) -> Any:
+        sources, page_size = self.prepare(queryset, pagination)
+        total = None
+        if pagination.estimate_total:
+            total = 0
+            for source, _, _ in sources:
+                total += await sync_to_async(estimate_count)(source)
+        pages = [([item async for item in page], keys) for _, page, keys in sources]
+        return self.build(pages, page_size, total)
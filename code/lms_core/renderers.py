@@ -0,0 +1,42 @@
+from django.conf import settings
+from ninja.parser import Parser
+from ninja.renderers import BaseRenderer, JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, jatuh ke json bawaan
+    orjson = None
+
+
+def _default(obj):
+    # tipe yang tidak ditangani orjson (Decimal, BaseModel, Url, ...) diserahkan ke encoder ninja
+    return NinjaJSONEncoder().default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Renderer JSON berbasis orjson; datetime, UUID, dan dataclass ditangani secara native."""
+
+    media_type = "application/json"
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, request, data, *, response_status):
+        return orjson.dumps(data, default=_default, option=self.options)
+
+
+class ORJSONParser(Parser):
+    def parse_body(self, request):
+        return orjson.loads(request.body)
+
+
+def get_renderer():
+    """Renderer untuk apiv1 sesuai settings.API_JSON_BACKEND ("orjson" atau "json")."""
+    if getattr(settings, "API_JSON_BACKEND", "orjson") == "orjson" and orjson is not None:
+        return ORJSONRenderer()
+    return JSONRenderer()
+
+
+def get_parser():
+    if getattr(settings, "API_JSON_BACKEND", "orjson") == "orjson" and orjson is not None:
+        return ORJSONParser()
+    return Parser()
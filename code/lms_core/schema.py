@@ -1,8 +1,8 @@
 from ninja import Schema
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel  
-from typing import List 
+from pydantic import BaseModel, Field
+from typing import List, Dict 
 
 
 from django.contrib.auth.models import User
@@ -32,9 +32,13 @@ class CourseSchemaOut(Schema):
     description: str
     price: int
     image : Optional[str]
+    image_variants: Dict[str, str] = {}
     teacher: UserOut
     created_at: datetime
     updated_at: datetime
+    # Hanya terisi di katalog dan detail course
+    rating_count: Optional[int] = None
+    rating_mean: Optional[float] = None
 
 class CourseMemberOut(Schema):
     id: int 
@@ -69,6 +73,13 @@ class CourseContentFull(Schema):
     created_at: datetime
     updated_at: datetime
 
+class CourseOutlineNode(Schema):
+    id: int
+    name: str
+    description: str
+    video_url: Optional[str]
+    children: List["CourseOutlineNode"]
+
 class CourseCommentOut(Schema):
     id: int
     content_id: CourseContentMini
@@ -84,6 +95,8 @@ class AnnouncementSchemaIn(Schema):
 
     title: str  
     content: str
+    # Kosong = langsung tampil; isi dengan waktu mendatang untuk menjadwalkan pengumuman
+    date_announcement: Optional[datetime] = None
   
 class AnnouncementSchemaOut(Schema):  
     id: int  
@@ -95,7 +108,7 @@ class AnnouncementSchemaOut(Schema):
     date_announcement: datetime 
 
 class FeedbackSchemaIn(Schema):  
-    rating: int  
+    rating: int = Field(..., ge=1, le=5)
     comments: str  
   
 class FeedbackSchemaOut(Schema):  
@@ -112,13 +125,20 @@ class ShowFeedbackSchemaOut(Schema):
     course_name: str  
     student_name: str  
     rating: int  
-    comments: str  
+    comments: Optional[str] = None
     created_at: datetime 
+class CourseRatingOut(Schema):
+    course_id: int
+    count: int
+    mean: Optional[float] = None
+    # jumlah rating per nilai "1".."5"
+    histogram: Dict[str, int]
+
 class FeedbackListSchemaOut(BaseModel):  
     feedbacks: List[ShowFeedbackSchemaOut] 
 
 class EditFeedbackSchema(BaseModel):  
-    rating: int  
+    rating: int = Field(..., ge=1, le=5)
     comments: str  
 
 class BookmarkSchemaIn(BaseModel):  
@@ -138,4 +158,15 @@ class ShowBookmarkSchemaOut(BaseModel):
 
 class BatchEnrollSchemaIn(BaseModel):  
     student_ids: List[int]  # Daftar ID siswa yang akan didaftarkan  
-    course_id: int  # ID kursus  
\ No newline at end of file
+    course_id: int  # ID kursus  
+
+class SearchResultOut(Schema):
+    kind: str  # "course" atau "content"
+    id: int
+    course_id: int
+    name: str
+    rank: float
+
+class SearchResultsOut(Schema):
+    items: List[SearchResultOut]
+    next_offset: Optional[int]
@@ -0,0 +1,137 @@
+"""Pencarian full-text atas nama/deskripsi course dan konten.
+
+PostgreSQL: kolom tsvector generated (search_vector) dengan index GIN.
+SQLite: tabel FTS5 external-content yang dijaga tetap sinkron oleh trigger.
+"""
+import re
+
+# Konfigurasi teks PostgreSQL; harus sama saat membangun vektor dan saat query
+SEARCH_CONFIG = "english"
+
+# (tabel, kolom course_id) yang diindeks; course_id milik course adalah id-nya sendiri
+SEARCH_TABLES = {
+    "course": ("lms_core_course", "id"),
+    "content": ("lms_core_coursecontent", "course_id_id"),
+}
+
+
+def install(connection):
+    """Pasang index full-text. Idempoten, aman dijalankan ulang setelah migrasi apa pun."""
+    if connection.vendor == "postgresql":
+        statements = _postgresql_ddl()
+    elif connection.vendor == "sqlite":
+        statements = _sqlite_ddl()
+    else:
+        return
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for table, _ in SEARCH_TABLES.values():
+            if connection.vendor == "postgresql":
+                cursor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+            elif connection.vendor == "sqlite":
+                for suffix in ("ai", "ad", "au"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+def _postgresql_ddl():
+    statements = []
+    for table, _ in SEARCH_TABLES.values():
+        # nama diberi bobot lebih tinggi (A) daripada deskripsi (B)
+        statements += [
+            f"""ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+                    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+                ) STORED""",
+            f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (search_vector)",
+        ]
+    return statements
+
+
+def _sqlite_ddl():
+    statements = []
+    for table, _ in SEARCH_TABLES.values():
+        fts = f"{table}_fts"
+        statements += [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                name, description, content='{table}', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2')""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END""",
+        ]
+    return statements
+
+
+def rebuild(connection):
+    """Bangun ulang isi index FTS5 dari tabel sumber (PostgreSQL tidak perlu: kolomnya generated)."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for table, _ in SEARCH_TABLES.values():
+            cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def search(connection, query, limit, offset):
+    """Hasil pencarian berperingkat sebagai list dict (kind, id, course_id, name, rank)."""
+    if connection.vendor == "postgresql":
+        sql, params = _postgresql_search(query)
+    elif connection.vendor == "sqlite":
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        # setiap kata dikutip agar input pengguna tidak dibaca sebagai sintaks FTS5
+        sql, params = _sqlite_search(" ".join(f'"{term}"' for term in terms))
+    else:
+        return []
+
+    sql += " ORDER BY rank DESC, kind, id LIMIT %s OFFSET %s"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit, offset])
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _postgresql_search(query):
+    parts = []
+    params = []
+    for kind, (table, course_col) in SEARCH_TABLES.items():
+        parts.append(
+            f"""SELECT '{kind}' AS kind, id, {course_col} AS course_id, name,
+                       ts_rank(search_vector, query) AS rank
+                FROM {table}, websearch_to_tsquery('{SEARCH_CONFIG}', %s) query
+                WHERE search_vector @@ query"""
+        )
+        params.append(query)
+    return " UNION ALL ".join(parts), params
+
+
+def _sqlite_search(match):
+    parts = []
+    params = []
+    for kind, (table, course_col) in SEARCH_TABLES.items():
+        # bm25: makin kecil makin relevan, jadi dinegasikan; kolom name berbobot 10x
+        parts.append(
+            f"""SELECT '{kind}' AS kind, src.id AS id, src.{course_col} AS course_id, src.name AS name,
+                       -bm25({table}_fts, 10.0, 1.0) AS rank
+                FROM {table}_fts JOIN {table} src ON src.id = {table}_fts.rowid
+                WHERE {table}_fts MATCH %s"""
+        )
+        params.append(match)
+    return " UNION ALL ".join(parts), params
@@ -0,0 +1,186 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from lms_core.cache import bump_catalog, invalidate_dashboard, invalidate_membership, invalidate_outline
+from lms_core.models import Announcement, Comment, Course, CourseContent, CourseMember, CourseStats, Feedback, InboxItem
+from lms_core.tasks import fan_out_announcement, fill_inbox, schedule
+
+
+def comment_course_id(comment):
+    # Pakai konten yang sudah ter-cache di objek komentar bila ada; kalau kontennya
+    # sudah terhapus (cascade) hasilnya None
+    if Comment.content_id.is_cached(comment):
+        return comment.content_id.course_id_id
+    return CourseContent.objects.filter(id=comment.content_id_id).values_list("course_id", flat=True).first()
+
+
+@receiver(post_save, sender=CourseMember)
+def member_created(sender, instance, created, **kwargs):
+    if created:
+        CourseStats.increment(instance.course_id_id, "members_count")
+
+
+@receiver(post_delete, sender=CourseMember)
+def member_deleted(sender, instance, **kwargs):
+    CourseStats.increment(instance.course_id_id, "members_count", -1)
+
+
+@receiver(post_save, sender=CourseContent)
+def content_created(sender, instance, created, **kwargs):
+    if created:
+        CourseStats.increment(instance.course_id_id, "content_count")
+
+
+@receiver(post_delete, sender=CourseContent)
+def content_deleted(sender, instance, **kwargs):
+    CourseStats.increment(instance.course_id_id, "content_count", -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        course_id = comment_course_id(instance)
+        if course_id is not None:
+            CourseStats.increment(course_id, "comments_count")
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    course_id = comment_course_id(instance)
+    if course_id is not None:
+        CourseStats.increment(course_id, "comments_count", -1)
+
+
+# Rating yang tersimpan di database dicatat saat objek dimuat, supaya perubahan
+# rating bisa diterapkan ke ringkasan sebagai selisih
+
+
+@receiver(post_init, sender=Feedback)
+def feedback_loaded(sender, instance, **kwargs):
+    # Field yang di-defer (only()/defer()) tidak dibaca agar tidak memicu query; None = tidak diketahui
+    instance._saved_rating = instance.__dict__.get("rating") if instance.pk else None
+
+
+@receiver(post_save, sender=Feedback)
+def feedback_saved(sender, instance, created, **kwargs):
+    if created:
+        CourseStats.update_rating(instance.course_id, new=instance.rating)
+    elif instance._saved_rating is None:
+        CourseStats.rebuild([instance.course_id])
+    elif instance._saved_rating != instance.rating:
+        CourseStats.update_rating(instance.course_id, old=instance._saved_rating, new=instance.rating)
+    else:
+        return
+    instance._saved_rating = instance.rating
+    catalog_changed()
+
+
+@receiver(post_delete, sender=Feedback)
+def feedback_deleted(sender, instance, **kwargs):
+    if instance._saved_rating is None:
+        CourseStats.rebuild([instance.course_id])
+    else:
+        CourseStats.update_rating(instance.course_id, old=instance._saved_rating)
+    catalog_changed()
+
+
+# Katalog /courses divalidasi dengan satu versi di cache. Dinaikkan lagi setelah commit
+# supaya pembaca di tengah transaksi tidak memegang versi baru dengan data lama.
+
+
+def catalog_changed():
+    bump_catalog()
+    transaction.on_commit(bump_catalog)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_catalog_changed(sender, instance, **kwargs):
+    catalog_changed()
+
+
+@receiver(post_save, sender=User)
+def teacher_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Data pengajar ikut tampil di course; updated_at course dimajukan supaya semua
+    # validator course (detail, konten, katalog) berubah. Login hanya mengubah last_login.
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    if Course.objects.filter(teacher=instance).update(updated_at=timezone.now()):
+        catalog_changed()
+
+
+# Dashboard per user di-cache (lms_core/cache.py); hapus cache user yang datanya berubah
+
+
+def comment_user_id(comment):
+    # Endpoint komentar selalu memuat member-nya; query hanya untuk pemanggil lain
+    if Comment.member_id.is_cached(comment):
+        return comment.member_id.user_id_id
+    return CourseMember.objects.filter(id=comment.member_id_id).values_list("user_id", flat=True).first()
+
+
+@receiver(post_save, sender=CourseMember)
+@receiver(post_delete, sender=CourseMember)
+def member_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.user_id_id)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.teacher_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate_dashboard(comment_user_id(instance))
+
+
+
+# Cache keanggotaan per (course, user) dipakai untuk otorisasi; hapus saat baris CourseMember berubah.
+# Dihapus lagi setelah commit supaya pembaca yang memuat ulang cache sebelum transaksi
+# selesai tidak meninggalkan data lama.
+
+
+@receiver(post_save, sender=CourseMember)
+@receiver(post_delete, sender=CourseMember)
+def membership_changed(sender, instance, **kwargs):
+    course_id, user_id = instance.course_id_id, instance.user_id_id
+    invalidate_membership(course_id, user_id)
+    transaction.on_commit(lambda: invalidate_membership(course_id, user_id))
+
+
+@receiver(post_save, sender=CourseContent)
+@receiver(post_delete, sender=CourseContent)
+def content_changed(sender, instance, **kwargs):
+    invalidate_outline(instance.course_id_id)
+
+
+# Inbox siswa: pengumuman course kecil disalin ke InboxItem oleh worker setelah commit
+
+
+@receiver(post_save, sender=Announcement)
+def announcement_saved(sender, instance, created, **kwargs):
+    if created:
+        schedule(fan_out_announcement, instance.id)
+    else:
+        # jadwal tampil bisa diubah; salinan tanggal di inbox ikut diperbarui
+        InboxItem.objects.filter(announcement=instance).exclude(
+            date_announcement=instance.date_announcement
+        ).update(date_announcement=instance.date_announcement)
+
+
+@receiver(post_save, sender=CourseMember)
+def member_inbox_created(sender, instance, created, **kwargs):
+    if created:
+        schedule(fill_inbox, instance.course_id_id, [instance.user_id_id])
+
+
+@receiver(post_delete, sender=CourseMember)
+def member_inbox_deleted(sender, instance, **kwargs):
+    InboxItem.objects.filter(user_id=instance.user_id_id,
+                             announcement__course_id=instance.course_id_id).delete()
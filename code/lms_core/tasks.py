@@ -0,0 +1,137 @@
+"""Pekerjaan latar belakang yang dijalankan di luar siklus request.
+
+Memakai ThreadPoolExecutor per proses; cukup untuk pekerjaan ringan seperti
+membuat thumbnail. Pekerjaan dijadwalkan setelah transaksi commit supaya
+worker selalu melihat data yang sudah tersimpan.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from lms_core.cache import bump_catalog
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+            thread_name_prefix="lms-task",
+        )
+    return _executor
+
+
+def run_task(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s gagal", func.__name__)
+    finally:
+        # thread worker punya koneksi database sendiri
+        close_old_connections()
+
+
+def schedule(func, *args):
+    """Jalankan func(*args) di worker pool setelah transaksi aktif commit."""
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        transaction.on_commit(lambda: func(*args))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(run_task, func, *args))
+
+
+def variant_name(name, width):
+    stem, ext = os.path.splitext(name)
+    directory, filename = os.path.split(stem)
+    return os.path.join(directory, "variants", f"{filename}_{width}{ext}")
+
+
+def generate_course_image_variants(course_id, image_name, stale_names=()):
+    """Buat versi kecil gambar course untuk setiap lebar di COURSE_IMAGE_WIDTHS."""
+    from lms_core.models import Course
+
+    for name in stale_names:
+        default_storage.delete(name)
+
+    # gambar sudah diganti lagi sebelum pekerjaan ini berjalan: biarkan pekerjaan terbaru
+    if not Course.objects.filter(id=course_id, image=image_name).exists():
+        return
+
+    variants = {}
+    with default_storage.open(image_name, "rb") as f:
+        original = Image.open(f)
+        original.load()
+    image_format = original.format or "JPEG"
+    for width in sorted(getattr(settings, "COURSE_IMAGE_WIDTHS", [160, 480, 960])):
+        if width >= original.width:
+            break
+        height = max(round(original.height * width / original.width), 1)
+        resized = original.resize((width, height), Image.LANCZOS)
+        if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+        buffer = BytesIO()
+        resized.save(buffer, format=image_format)
+        variants[str(width)] = default_storage.save(variant_name(image_name, width), ContentFile(buffer.getvalue()))
+
+    # updated_at ikut diperbarui agar ETag course berubah saat varian siap
+    if Course.objects.filter(id=course_id, image=image_name).update(
+        image_variants=variants, updated_at=timezone.now()
+    ):
+        bump_catalog()
+
+
+def fan_out_announcement(announcement_id):
+    """Salin pengumuman ke inbox setiap anggota bila course-nya kecil.
+
+    Pengumuman course besar tetap fanned_out=False dan dibaca langsung dari tabel
+    Announcement saat inbox dimuat (merge on read).
+    """
+    from lms_core.models import Announcement, CourseMember, CourseStats, InboxItem
+
+    announcement = Announcement.objects.filter(id=announcement_id).values("course_id", "date_announcement").first()
+    if announcement is None:
+        return
+    course_id = announcement["course_id"]
+    members = CourseStats.objects.filter(course_id=course_id).values_list("members_count", flat=True).first()
+    if members is None:
+        members = CourseMember.objects.filter(course_id=course_id).count()
+    if members > getattr(settings, "INBOX_FANOUT_THRESHOLD", 500):
+        return
+
+    user_ids = CourseMember.objects.filter(course_id=course_id).values_list("user_id", flat=True)
+    with transaction.atomic():
+        InboxItem.objects.bulk_create(
+            [InboxItem(user_id=user_id, announcement_id=announcement_id,
+                       date_announcement=announcement["date_announcement"]) for user_id in user_ids],
+            batch_size=500, ignore_conflicts=True,
+        )
+        Announcement.objects.filter(id=announcement_id).update(fanned_out=True)
+
+
+def fill_inbox(course_id, user_ids):
+    """Isi inbox anggota baru dengan pengumuman course yang sudah di-fan-out sebelumnya."""
+    from lms_core.models import Announcement, CourseMember, InboxItem
+
+    # hanya user yang masih terdaftar saat pekerjaan berjalan
+    members = list(CourseMember.objects.filter(course_id=course_id, user_id__in=user_ids)
+                   .values_list("user_id", flat=True))
+    if not members:
+        return
+    announcements = list(Announcement.objects.filter(course_id=course_id, fanned_out=True)
+                         .values_list("id", "date_announcement"))
+    InboxItem.objects.bulk_create(
+        [InboxItem(user_id=user_id, announcement_id=announcement_id, date_announcement=date)
+         for user_id in members for announcement_id, date in announcements],
+        batch_size=500, ignore_conflicts=True,
+    )
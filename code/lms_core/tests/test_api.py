@@ -1,14 +1,32 @@
 from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
-from lms_core.models import Course, CourseMember, CourseContent, Comment
+from lms_core.models import Course, CourseMember, CourseContent, Comment, Feedback, Announcement, InboxItem
 from lms_core.api import apiv1
+from lms_core.outline import build_outline
+from lms_core.auth import ClaimsUser, TokenCache, token_cache
+from lms_core.renderers import ORJSONRenderer, get_renderer, get_parser
+from ninja.parser import Parser
+from ninja.renderers import JSONRenderer
+from datetime import datetime, timezone
+from decimal import Decimal
 import json
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+import time
 
 class APITestCase(TestCase):
 
     base_url = '/api/v1/'
 
     def setUp(self):
+        cache.clear()
         self.teacher = User.objects.create_user(username='teacher', password='password123')
         self.student = User.objects.create_user(username='student', password='password123')
         
@@ -73,6 +91,25 @@ class APITestCase(TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json()['comment'], 'This is a comment')
 
+    def test_create_content_comment_queries(self):
+        content = CourseContent.objects.create(course_id=self.course, name="Content Title",
+                                               description="Content Description")
+        self.client.post(f'{self.base_url}courses/{self.course.id}/enroll',
+                         **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)})
+        url = f'{self.base_url}contents/{content.id}/comments'
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        # komentar pertama mengisi cache keanggotaan
+        self.client.post(url, data={'comment': 'Pertama'}, content_type='application/json', **headers)
+
+        # konten+course+teacher, member+user, insert komentar, counter CourseStats
+        with self.assertNumQueries(4):
+            response = self.client.post(url, data={'comment': 'Kedua'}, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body['member_id']['user_id']['id'], self.student.id)
+        self.assertEqual(body['member_id']['course_id']['teacher']['id'], self.teacher.id)
+        self.assertEqual(body['content_id']['course_id']['id'], self.course.id)
+
     def test_delete_comment(self):
         content = CourseContent.objects.create(course_id=self.course, 
                                                name="Content Title", 
@@ -84,7 +121,504 @@ class APITestCase(TestCase):
                                     content_type='application/json',
                                     **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)})
         comment_id = response.json()['id']
-        response = self.client.delete(f'{self.base_url}comments/{comment_id}', 
-                                    **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)})
+        # komentar+member+konten, delete, counter CourseStats; signal tidak query ulang member/konten
+        with self.assertNumQueries(3):
+            response = self.client.delete(f'{self.base_url}comments/{comment_id}', 
+                                        **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)})
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Comment.objects.filter(id=comment_id).exists())
+
+    def test_batch_enroll_students(self):
+        other = User.objects.create(username='other')
+        CourseMember.objects.create(course_id=self.course, user_id=other)
+        response = self.client.post(f'{self.base_url}courses/{self.course.id}/enroll-batch',
+                                    data=json.dumps({'course_id': self.course.id,
+                                                     'student_ids': [self.student.id, other.id, 9999, self.student.id]}),
+                                    content_type='application/json',
+                                    **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.token)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'enrolled_students': [self.student.id],
+            'already_enrolled': [other.id],
+            'not_found': [9999],
+        })
+        self.assertEqual(CourseMember.objects.filter(course_id=self.course).count(), 2)
+        # siswa baru sudah masuk cache keanggotaan lewat set_many
+        with self.assertNumQueries(0):
+            self.assertTrue(self.course.is_member(self.student))
+
+    def test_batch_enroll_fills_inbox(self):
+        announcement = Announcement.objects.create(course=self.course, teacher=self.teacher,
+                                                   title="Lama", content="-", fanned_out=True)
+        with self.settings(BACKGROUND_TASKS_EAGER=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'{self.base_url}courses/{self.course.id}/enroll-batch',
+                                            data=json.dumps({'course_id': self.course.id,
+                                                             'student_ids': [self.student.id]}),
+                                            content_type='application/json',
+                                            **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.token)})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(InboxItem.objects.filter(user=self.student, announcement=announcement).exists())
+
+        response = self.client.get(f'{self.base_url}inbox',
+                                   **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)})
+        self.assertEqual([item['title'] for item in response.json()['items']], ['Lama'])
+
+    def test_course_analytics(self):
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        CourseContent.objects.create(course_id=self.course, name="Content Title")
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.base_url}courses/{self.course.id}/analytics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'members_count': 1, 'content_count': 1,
+                                           'comments_count': 0, 'feedback_count': 0})
+
+    def test_user_activity_dashboard_is_cached_and_invalidated(self):
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        response = self.client.get(f'{self.base_url}user/activity/dashboard', **auth)
+        self.assertEqual(response.json()['courses_joined'], 0)
+
+        with self.assertNumQueries(0):
+            self.client.get(f'{self.base_url}user/activity/dashboard', **auth)
+
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        response = self.client.get(f'{self.base_url}user/activity/dashboard', **auth)
+        self.assertEqual(response.json(), {'courses_joined': 1, 'courses_created': 0, 'comments_written': 0})
+
+
+    def test_detail_course_conditional_get(self):
+        url = f'{self.base_url}courses/{self.course.id}'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.course.name = "Django Lanjutan"
+        self.course.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_teacher_change_invalidates_course_validators(self):
+        url = f'{self.base_url}courses/{self.course.id}'
+        etag = self.client.get(url)['ETag']
+        catalog_etag = self.client.get(f'{self.base_url}courses')['ETag']
+
+        self.teacher.first_name = "Budi"
+        self.teacher.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['teacher']['first_name'], "Budi")
+        response = self.client.get(f'{self.base_url}courses', HTTP_IF_NONE_MATCH=catalog_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_courses_conditional_get(self):
+        url = f'{self.base_url}courses'
+        etag = self.client.get(url)['ETag']
+        # validator katalog dibaca dari cache, tanpa query
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Course.objects.create(name="Course Baru", description="-", price=10, teacher=self.teacher)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['items']), 2)
+
+    def test_list_content_course_conditional_get(self):
+        url = f'{self.base_url}courses/{self.course.id}/contents'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        CourseContent.objects.create(course_id=self.course, name="Content Title")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_list_courses_cursor_pagination(self):
+        Course.objects.bulk_create([
+            Course(name=f"Course {i}", description="-", price=10, teacher=self.teacher)
+            for i in range(24)
+        ])
+        # created_at kembar: urutan tetap stabil karena id ikut jadi kunci
+        Course.objects.update(created_at=self.course.created_at)
+
+        data = self.client.get(f'{self.base_url}courses?estimate_total=true').json()
+        if connection.vendor == 'postgresql':
+            # estimasi planner, bukan hitungan pasti
+            self.assertIsInstance(data['estimated_total'], int)
+        else:
+            self.assertEqual(data['estimated_total'], 25)
+
+        seen = []
+        url = f'{self.base_url}courses'
+        while url:
+            data = self.client.get(url).json()
+            seen += [course['id'] for course in data['items']]
+            cursor = data['next_cursor']
+            url = f'{self.base_url}courses?cursor={cursor}' if cursor else None
+        self.assertEqual(seen, sorted(Course.objects.values_list('id', flat=True), reverse=True))
+
+        response = self.client.get(f'{self.base_url}courses?cursor=bm90LWEtY3Vyc29y')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor.'})
+
+    def test_show_feedback_paginated(self):
+        Feedback.objects.create(course=self.course, student=self.student, rating=5, comments="Bagus")
+        response = self.client.get(f'{self.base_url}courses/{self.course.id}/feedback')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['feedbacks'][0]['student_name'], 'student')
+        self.assertIsNone(response.json()['next_cursor'])
+
+        response = self.client.get(f'{self.base_url}courses/0/feedback')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Course not found.'})
+
+    def test_listings_constant_queries(self):
+        def query_count(url):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, **auth)
+            self.assertEqual(response.status_code, 200)
+            return len(queries), response.json()
+
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        feedback_url = f'{self.base_url}courses/{self.course.id}/feedback?page_size=100'
+        announcement_url = f'{self.base_url}courses/{self.course.id}/announcements?page_size=100'
+        students = User.objects.bulk_create([User(username=f'siswa{i}') for i in range(120)])
+        Feedback.objects.bulk_create([Feedback(course=self.course, student=s, rating=4) for s in students[:5]])
+        Announcement.objects.bulk_create([
+            Announcement(course=self.course, teacher=self.teacher, title=f"A{i}", content="-") for i in range(5)
+        ])
+        few_feedback, data = query_count(feedback_url)
+        few_announcements, _ = query_count(announcement_url)
+        self.assertEqual(len(data['feedbacks']), 5)
+        self.assertEqual(data['feedbacks'][0]['course_name'], self.course.name)
+        self.assertIsNone(data['feedbacks'][0]['comments'])
+
+        Feedback.objects.bulk_create([Feedback(course=self.course, student=s, rating=3) for s in students[5:]])
+        Announcement.objects.bulk_create([
+            Announcement(course=self.course, teacher=self.teacher, title=f"B{i}", content="-") for i in range(115)
+        ])
+        many_feedback, data = query_count(feedback_url)
+        many_announcements, _ = query_count(announcement_url)
+        self.assertEqual(len(data['feedbacks']), 100)
+        self.assertEqual(many_feedback, few_feedback)
+        self.assertEqual(many_announcements, few_announcements)
+        # cek course + satu query halaman
+        self.assertEqual(many_feedback, 2)
+        self.assertEqual(many_announcements, 2)
+
+    def test_course_rating_summary(self):
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        unrated = Course.objects.create(name="Tanpa Rating", description="-", price=0, teacher=self.teacher)
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+
+        response = self.client.post(f'{self.base_url}courses/{self.course.id}/feedback',
+                                    data=json.dumps({'rating': 6, 'comments': '-'}),
+                                    content_type='application/json', **auth)
+        self.assertEqual(response.status_code, 422)
+        response = self.client.post(f'{self.base_url}courses/{self.course.id}/feedback',
+                                    data=json.dumps({'rating': 4, 'comments': 'Oke'}),
+                                    content_type='application/json', **auth)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.base_url}courses/{self.course.id}/rating')
+        self.assertEqual(response.json(), {'course_id': self.course.id, 'count': 1, 'mean': 4.0,
+                                           'histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 0}})
+        response = self.client.get(f'{self.base_url}courses/{unrated.id}/rating')
+        self.assertEqual(response.json()['count'], 0)
+        self.assertIsNone(response.json()['mean'])
+        self.assertEqual(self.client.get(f'{self.base_url}courses/0/rating').status_code, 404)
+
+        detail = self.client.get(f'{self.base_url}courses/{self.course.id}').json()
+        self.assertEqual((detail['rating_count'], detail['rating_mean']), (1, 4.0))
+
+        data = self.client.get(f'{self.base_url}courses?min_rating=3.5').json()
+        self.assertEqual([course['id'] for course in data['items']], [self.course.id])
+
+        # urut rating: course tanpa rating di akhir, cursor memakai kunci rating
+        data = self.client.get(f'{self.base_url}courses?sort=rating&page_size=1').json()
+        self.assertEqual(data['items'][0]['id'], self.course.id)
+        data = self.client.get(f'{self.base_url}courses?sort=rating&page_size=1&cursor={data["next_cursor"]}').json()
+        self.assertEqual([course['id'] for course in data['items']], [unrated.id])
+        self.assertIsNone(data['next_cursor'])
+
+        # ETag katalog berubah saat rating berubah walau data course sama
+        etag = self.client.get(f'{self.base_url}courses')['ETag']
+        Feedback.objects.get(course=self.course).delete()
+        self.assertNotEqual(self.client.get(f'{self.base_url}courses')['ETag'], etag)
+
+    def test_jwt_user_from_claims_without_query(self):
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        # hanya query bookmark, tidak ada lookup baris User
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.base_url}content/bookmarks', **auth)
+        self.assertEqual(response.status_code, 200)
+
+        user = ClaimsUser({'user_id': self.student.id, 'username': 'student'})
+        self.assertEqual(user.username, 'student')
+        with self.assertNumQueries(1):
+            self.assertEqual(user.user, self.student)
+            self.assertEqual(user.user, self.student)
+
+    def test_verified_token_cache(self):
+        token_cache.clear()
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        self.client.get(f'{self.base_url}mycourses', **auth)
+        self.client.get(f'{self.base_url}mycourses', **auth)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+        # entri kedaluwarsa mengikuti exp token
+        cache_key = TokenCache.key(self.student_token)
+        exp, claims = token_cache._entries[cache_key]
+        token_cache._entries[cache_key] = (time.time() - 1, claims)
+        self.client.get(f'{self.base_url}mycourses', **auth)
+        self.assertEqual(token_cache.stats()['misses'], 2)
+
+    def test_token_cache_is_bounded(self):
+        cache = TokenCache(maxsize=2)
+        exp = time.time() + 60
+        for token in ('a', 'b', 'c'):
+            cache.set(token, {'user_id': 1, 'exp': exp})
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), {'user_id': 1, 'exp': exp})
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_list_content_comment_feed(self):
+        content = CourseContent.objects.create(course_id=self.course, name="Content Title")
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        comments = Comment.objects.bulk_create([
+            Comment(content_id=content, member_id=member, comment=f"Komentar {i}") for i in range(5)
+        ])
+        for i, comment in enumerate(comments):
+            comment.created_at = datetime(2024, 1, 1, 8, i, tzinfo=timezone.utc)
+        Comment.objects.bulk_update(comments, ['created_at'])
+        url = f'{self.base_url}contents/{content.id}/comments'
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        self.client.get(url, **auth)
+
+        # jumlah query tetap: konten, komentar beserta semua relasinya
+        with self.assertNumQueries(2):
+            data = self.client.get(f'{url}?page_size=3', **auth).json()
+        self.assertEqual([c['comment'] for c in data['items']], ['Komentar 4', 'Komentar 3', 'Komentar 2'])
+        self.assertEqual(data['items'][0]['member_id']['user_id']['id'], self.student.id)
+        data = self.client.get(f"{url}?page_size=3&cursor={data['next_cursor']}", **auth).json()
+        self.assertEqual([c['comment'] for c in data['items']], ['Komentar 1', 'Komentar 0'])
+
+        since = comments[2].created_at.isoformat()
+        data = self.client.get(url, {'since': since}, **auth).json()
+        self.assertEqual([c['comment'] for c in data['items']], ['Komentar 4', 'Komentar 3'])
+
+        outsider = User.objects.create_user(username='outsider', password='password123')
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'outsider', 'password': 'password123'}),
+                                 content_type='application/json')
+        # bukan guru dan bukan anggota course: feed komentar ditolak
+        self.assertNotEqual(outsider.id, self.course.teacher_id)
+        self.assertFalse(self.course.is_member(outsider))
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer ' + login.json()['access'])
+        self.assertEqual(response.status_code, 403)
+
+    def test_course_outline(self):
+        bab1 = CourseContent.objects.create(course_id=self.course, name="Bab 1")
+        sub = CourseContent.objects.create(course_id=self.course, name="Bab 1.1", parent_id=bab1)
+        CourseContent.objects.create(course_id=self.course, name="Bab 1.1.1", parent_id=sub)
+        CourseContent.objects.create(course_id=self.course, name="Bab 2")
+        url = f'{self.base_url}courses/{self.course.id}/outline'
+
+        # seluruh hierarki diambil dengan satu query rekursif
+        with self.assertNumQueries(1):
+            data = self.client.get(url).json()
+        self.assertEqual([node['name'] for node in data], ['Bab 1', 'Bab 2'])
+        self.assertEqual(data[0]['children'][0]['children'][0]['name'], 'Bab 1.1.1')
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        sub.name = "Bab 1.A"
+        sub.save()
+        data = self.client.get(url).json()
+        self.assertEqual(data[0]['children'][0]['name'], 'Bab 1.A')
+
+        self.assertEqual(self.client.get(f'{self.base_url}courses/0/outline').status_code, 404)
+
+    def test_course_outline_not_found_is_not_cached(self):
+        missing_id = self.course.id + 1
+        url = f'{self.base_url}courses/{missing_id}/outline'
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        Course.objects.create(id=missing_id, name="Baru", description="-", price=0, teacher=self.teacher)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_build_outline_from_unordered_rows(self):
+        # fallback query datar tidak terurut per kedalaman
+        child = CourseContent(id=2, name="Anak", parent_id_id=1)
+        root = CourseContent(id=1, name="Akar")
+        outline = build_outline([child, root])
+        self.assertEqual(outline[0]['children'][0]['name'], 'Anak')
+
+    def test_search_courses_and_contents(self):
+        python = Course.objects.create(name="Python Programming", description="Learn Python basics.",
+                                       price=50, teacher=self.teacher)
+        CourseContent.objects.create(course_id=self.course, name="Models",
+                                     description="Django models are written in Python.")
+        url = f'{self.base_url}search'
+
+        data = self.client.get(url, {'q': 'python'}).json()
+        # kecocokan di nama lebih relevan daripada di deskripsi
+        self.assertEqual([(r['kind'], r['course_id']) for r in data['items']],
+                         [('course', python.id), ('content', self.course.id)])
+        self.assertIsNone(data['next_offset'])
+
+        data = self.client.get(url, {'q': 'python', 'limit': 1}).json()
+        self.assertEqual(len(data['items']), 1)
+        self.assertEqual(data['next_offset'], 1)
+
+        # index ikut berubah saat baris diubah atau dihapus
+        python.name = "Rust Programming"
+        python.description = "Systems programming."
+        python.save()
+        data = self.client.get(url, {'q': 'python'}).json()
+        self.assertEqual([r['kind'] for r in data['items']], ['content'])
+        CourseContent.objects.all().delete()
+        self.assertEqual(self.client.get(url, {'q': 'python "'}).json()['items'], [])
+
+    async def test_show_announcements_async(self):
+        await Announcement.objects.acreate(course=self.course, teacher=self.teacher,
+                                           title="Kuis", content="Kuis minggu depan")
+        auth = {'AUTHORIZATION': 'Bearer ' + str(self.token)}
+        response = await self.async_client.get(f'{self.base_url}courses/{self.course.id}/announcements',
+                                               headers=auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'][0]['title'], "Kuis")
+
+        response = await self.async_client.get(f'{self.base_url}courses/0/announcements', headers=auth)
+        self.assertEqual(response.status_code, 404)
+
+    def test_inbox_hybrid_fanout(self):
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        big_course = Course.objects.create(name="Kelas Besar", description="-", price=0, teacher=self.teacher)
+        CourseMember.objects.create(course_id=big_course, user_id=self.student)
+        auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.token)}
+
+        with self.settings(BACKGROUND_TASKS_EAGER=True, INBOX_FANOUT_THRESHOLD=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                small = self.client.post(f'{self.base_url}courses/{self.course.id}/announcements',
+                                         data=json.dumps({'title': 'Kecil', 'content': '-'}),
+                                         content_type='application/json', **auth)
+                CourseMember.objects.create(course_id=big_course, user_id=self.teacher)
+                big = self.client.post(f'{self.base_url}courses/{big_course.id}/announcements',
+                                       data=json.dumps({'title': 'Besar', 'content': '-'}),
+                                       content_type='application/json', **auth)
+                scheduled = self.client.post(f'{self.base_url}courses/{self.course.id}/announcements',
+                                             data=json.dumps({'title': 'Nanti', 'content': '-',
+                                                              'date_announcement': '2999-01-01T00:00:00Z'}),
+                                             content_type='application/json', **auth)
+        self.assertEqual(scheduled.status_code, 201)
+        # course kecil disalin ke inbox, course besar (2 anggota > batas 1) dibaca langsung
+        self.assertTrue(Announcement.objects.get(id=small.json()['id']).fanned_out)
+        self.assertFalse(Announcement.objects.get(id=big.json()['id']).fanned_out)
+        self.assertTrue(InboxItem.objects.filter(user=self.student, announcement_id=small.json()['id']).exists())
+
+        student_auth = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+        # satu query per sumber (salinan inbox dan course besar), masing-masing dibatasi satu halaman
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{self.base_url}inbox', **student_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.json()['items']], ['Besar', 'Kecil'])
+
+        # cursor berlaku untuk gabungan kedua sumber
+        response = self.client.get(f'{self.base_url}inbox?page_size=1', **student_auth).json()
+        self.assertEqual([item['title'] for item in response['items']], ['Besar'])
+        response = self.client.get(f'{self.base_url}inbox?page_size=1&cursor={response["next_cursor"]}',
+                                   **student_auth).json()
+        self.assertEqual([item['title'] for item in response['items']], ['Kecil'])
+        self.assertIsNone(response['next_cursor'])
+
+        # pengumuman terjadwal hanya terlihat oleh guru
+        response = self.client.get(f'{self.base_url}courses/{self.course.id}/announcements', **student_auth)
+        self.assertEqual([item['title'] for item in response.json()['items']], ['Kecil'])
+        response = self.client.get(f'{self.base_url}courses/{self.course.id}/announcements', **auth)
+        self.assertEqual(len(response.json()['items']), 2)
+
+        # keluar dari course menghapus salinan inbox-nya
+        CourseMember.objects.filter(course_id=self.course, user_id=self.student).delete()
+        response = self.client.get(f'{self.base_url}inbox', **student_auth)
+        self.assertEqual([item['title'] for item in response.json()['items']], ['Besar'])
+
+    def test_create_course_image_variants(self):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), 'red').save(buffer, format='PNG')
+        upload = SimpleUploadedFile('cover.png', buffer.getvalue(), content_type='image/png')
+
+        with tempfile.TemporaryDirectory() as media_root, \
+                self.settings(MEDIA_ROOT=media_root, BACKGROUND_TASKS_EAGER=True, COURSE_IMAGE_WIDTHS=[160, 480]):
+            # thumbnail dibuat setelah commit
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.base_url+'courses', data={
+                    'name': 'Course Bergambar', 'description': '-', 'price': 10, 'image': upload,
+                }, **{'HTTP_AUTHORIZATION': 'Bearer ' + str(self.token)})
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['image_variants'], {})
+
+            course = Course.objects.get(id=response.json()['id'])
+            self.assertEqual(sorted(course.image_variants), ['160', '480'])
+            with default_storage.open(course.image_variants['160']) as f:
+                self.assertEqual(Image.open(f).size, (160, 80))
+
+            data = self.client.get(f'{self.base_url}courses/{course.id}').json()
+            self.assertEqual(data['image_variants'], course.image_variants)
+
+    def test_download_attachment(self):
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            content = CourseContent.objects.create(course_id=self.course, name="Slide")
+            content.file_attachment.save('slide.pdf', ContentFile(b'0123456789'))
+            url = f'{self.base_url}contents/{content.id}/attachment'
+            student = {'HTTP_AUTHORIZATION': 'Bearer ' + str(self.student_token)}
+
+            self.assertEqual(self.client.get(url, **student).status_code, 403)
+            CourseMember.objects.create(course_id=self.course, user_id=self.student)
+
+            response = self.client.get(url, **student)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+            self.assertEqual(response['Accept-Ranges'], 'bytes')
+            etag = response['ETag']
+
+            response = self.client.get(url, HTTP_RANGE='bytes=2-4', **student)
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+            self.assertEqual(b''.join(response.streaming_content), b'234')
+
+            response = self.client.get(url, HTTP_RANGE='bytes=-3', **student)
+            self.assertEqual(b''.join(response.streaming_content), b'789')
+            self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=20-', **student).status_code, 416)
+            # If-Range yang tidak cocok: kirim file utuh
+            response = self.client.get(url, HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"lama"', **student)
+            self.assertEqual(response.status_code, 200)
+
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag, **student).status_code, 304)
+
+            with self.settings(ATTACHMENT_ACCEL_REDIRECT_PREFIX='/protected/'):
+                response = self.client.get(url, **student)
+            self.assertEqual(response['X-Accel-Redirect'], '/protected/slide.pdf')
+
+
+class RendererTest(TestCase):
+
+    def test_orjson_renderer_matches_json_output(self):
+        data = {'price': Decimal('10.50'), 'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)}
+        body = ORJSONRenderer().render(None, data, response_status=200)
+        self.assertEqual(json.loads(body), {'price': '10.50', 'created_at': '2024-01-02T03:04:05Z'})
+
+    def test_backend_selectable_in_settings(self):
+        self.assertIsInstance(get_renderer(), ORJSONRenderer)
+        with self.settings(API_JSON_BACKEND='json'):
+            self.assertIs(type(get_renderer()), JSONRenderer)
+            self.assertIs(type(get_parser()), Parser)
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+import importer2
+from importer2 import (CopyWriter, ImportIndex, Manifest, OrmWriter, PasswordHasher,
+                       build_stages, iter_json_array, run_stages)
+from lms_core.models import Course, CourseMember
+
+class IterJsonArrayTest(TestCase):
+
+    def test_matches_json_load(self):
+        # chunk kecil supaya elemen terpotong di batas buffer
+        with open('csv_data/contents.json') as f:
+            expected = json.load(f)
+        with open('csv_data/contents.json') as f:
+            self.assertEqual(list(iter_json_array(f, chunk_size=7)), expected)
+
+    def test_scalars_and_nested_values(self):
+        data = ' [ 12345 , "a,]b" ,{"x": [1, {"y": null}]}, true ,-0.5e3 ] '
+        self.assertEqual(list(iter_json_array(io.StringIO(data), chunk_size=2)), json.loads(data))
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(io.StringIO('[ ]'))), [])
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('{"a": 1}')))
+
+    def test_truncated_file(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"a": 1}, {"b"'), chunk_size=4))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "COPY hanya tersedia di PostgreSQL")
+class CopyWriterTest(TestCase):
+
+    def test_finish_resets_sequences_of_stages_written_earlier(self):
+        # run sebelumnya menulis user lewat COPY lalu gagal sebelum finish()
+        CopyWriter().write(User, [User(username=f'copy{i}') for i in range(3)])
+
+        # run lanjutan melewati tahap users, tapi sequence-nya tetap disetel ulang
+        CopyWriter().finish()
+        user = User.objects.create(username='setelah-import')
+        self.assertEqual(user.id, User.objects.exclude(id=user.id).order_by('-id').first().id + 1)
+
+
+class CrashingWriter(OrmWriter):
+    """Gagal saat menulis batch ke-`after`+1 untuk model tertentu, mensimulasikan import yang terputus."""
+
+    def __init__(self, model, after):
+        self.model = model
+        self.after = after
+
+    def write(self, model, objs):
+        if model is self.model:
+            if self.after == 0:
+                raise RuntimeError("import terputus")
+            self.after -= 1
+        super().write(model, objs)
+
+
+class ResumeImportTest(TransactionTestCase):
+    # id harus mulai dari 1: tahap posisional mencocokkan baris ke-n dengan pk n
+    reset_sequences = True
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        patcher = mock.patch.object(importer2, 'filepath', self.dir + '/')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manifest_path = os.path.join(self.dir, '.import-manifest.json')
+
+        self.write_csv('user-data.csv', ['username', 'password', 'email', 'firstname', 'lastname'],
+                       [[f'user{i}', 'rahasia', f'user{i}@example.com', 'Nama', 'Akhir'] for i in range(6)])
+        self.write_csv('course-data.csv', ['name', 'price', 'description', 'teacher'],
+                       [[f'Course {i}', 10, '-', 1] for i in range(5)])
+        self.write_csv('member-data.csv', ['course_id', 'user_id', 'roles'],
+                       [[course_id, 2, 'std'] for course_id in range(1, 6)])
+        for filename in ('contents.json', 'comments.json'):
+            with open(os.path.join(self.dir, filename), 'w') as f:
+                f.write('[]')
+
+    def write_csv(self, filename, header, rows, mode='w'):
+        with open(os.path.join(self.dir, filename), mode, newline='') as f:
+            writer = csv.writer(f)
+            if mode == 'w':
+                writer.writerow(header)
+            writer.writerows(rows)
+
+    def run_import(self, writer):
+        index = ImportIndex()
+        stages = build_stages(index, PasswordHasher(1, 8))
+        skipped = {stage.name: 0 for stage in stages}
+        manifest = Manifest(self.manifest_path, str(connection.settings_dict['NAME']))
+        run_stages(stages, 1, index, writer, manifest, skipped, 2)
+        return {stage.name: (stage.created, stage.skipped, stage.status) for stage in stages}
+
+    def test_resume_after_crash_writes_no_duplicates(self):
+        # tahap course berhenti setelah batch pertama (2 baris) ter-commit
+        with self.assertRaises(RuntimeError):
+            self.run_import(CrashingWriter(Course, after=1))
+        self.assertEqual(Course.objects.count(), 2)
+        with open(self.manifest_path) as f:
+            files = json.load(f)['files']
+        self.assertEqual((files['course-data.csv']['offset'], files['course-data.csv']['complete']), (2, False))
+        self.assertTrue(files['user-data.csv']['complete'])
+
+        stages = self.run_import(OrmWriter())
+        self.assertEqual(stages['users'], (0, 0, 'tidak berubah'))
+        # dilanjutkan dari offset 2, baris yang sudah ada tidak dipindai ulang
+        self.assertEqual(stages['courses'], (3, 0, 'selesai'))
+        self.assertEqual(sorted(Course.objects.values_list('name', flat=True)), [f'Course {i}' for i in range(5)])
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(CourseMember.objects.count(), 5)
+
+    def test_changed_file_only_adds_new_rows(self):
+        self.run_import(OrmWriter())
+
+        # isi file berubah (baris baru di akhir): hash berbeda, tapi baris lama tidak ditulis ulang
+        self.write_csv('course-data.csv', None, [['Course 5', 10, '-', 1]], mode='a')
+        self.write_csv('member-data.csv', None, [[6, 2, 'std'], [1, 3, 'std']], mode='a')
+        stages = self.run_import(OrmWriter())
+        self.assertEqual(stages['users'], (0, 0, 'tidak berubah'))
+        # course posisional lanjut dari offset; member (kunci alami) dipindai ulang dan duplikatnya disaring
+        self.assertEqual(stages['courses'], (1, 0, 'selesai'))
+        self.assertEqual(stages['members'], (2, 5, 'selesai'))
+        self.assertEqual(Course.objects.count(), 6)
+        self.assertEqual(CourseMember.objects.count(), 7)
+
+    def test_recreated_database_is_imported_again(self):
+        self.run_import(OrmWriter())
+
+        # database dibuat ulang dengan nama yang sama; manifest lama tidak boleh dipercaya
+        call_command('flush', interactive=False, verbosity=0)
+        stages = self.run_import(OrmWriter())
+        self.assertEqual(stages['users'], (6, 0, 'selesai'))
+        self.assertEqual(stages['courses'], (5, 0, 'selesai'))
+        self.assertEqual(stages['members'], (5, 0, 'selesai'))
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(Course.objects.count(), 5)
+        self.assertEqual(CourseMember.objects.count(), 5)
@@ -0,0 +1,36 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class BackfillCourseStatsMigrationTest(TransactionTestCase):
+    migrate_from = [('lms_core', '0015_inbox_date')]
+    migrate_to = [('lms_core', '0016_backfill_course_stats')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        User = apps.get_model('auth', 'User')
+        Course = apps.get_model('lms_core', 'Course')
+        Feedback = apps.get_model('lms_core', 'Feedback')
+
+        # data lama: feedback tanpa baris statistik (model historis tidak memicu signal)
+        teacher = User.objects.create(username='guru')
+        students = [User.objects.create(username=f'siswa{i}') for i in range(3)]
+        self.course_id = Course.objects.create(name='Lama', description='-', price=0, teacher_id=teacher.id).id
+        for student, rating in zip(students, (5, 4, 4)):
+            Feedback.objects.create(course_id=self.course_id, student_id=student.id, rating=rating)
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_creates_missing_stats_rows(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        apps = executor.loader.project_state(self.migrate_to).apps
+        stats = apps.get_model('lms_core', 'CourseStats').objects.get(course_id=self.course_id)
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_4, stats.rating_5),
+                         (3, 13, 2, 1))
+        self.assertAlmostEqual(stats.rating_mean, 13 / 3)
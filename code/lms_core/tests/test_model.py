@@ -1,12 +1,15 @@
 # tests.py
 from django.test import TestCase
 from django.contrib.auth.models import User
-from lms_core.models import Course, CourseMember, ROLE_OPTIONS
+from django.core.cache import cache
+from lms_core.cache import get_membership
+from lms_core.models import Course, CourseMember, CourseContent, Comment, Feedback, CourseStats, ROLE_OPTIONS
 
 class CourseModelTest(TestCase):
 
     def setUp(self):
         # Menyiapkan data untuk pengujian
+        cache.clear()
         self.user = User.objects.create_user(username='teacher1', password='password123')
         self.student = User.objects.create_user(username='student1', password='password123')
         self.course = Course.objects.create(
@@ -38,6 +41,24 @@ class CourseModelTest(TestCase):
         # Setelah menambahkan anggota, harusnya True
         self.assertTrue(self.course.is_member(self.student))
 
+    def test_is_member_uses_membership_cache(self):
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        self.assertTrue(self.course.is_member(self.student.id))
+        # pemeriksaan berikutnya dijawab dari cache tanpa query
+        with self.assertNumQueries(0):
+            self.assertTrue(self.course.is_member(self.student))
+            self.assertEqual(get_membership(self.course.id, self.student.id), (member.id, 'std'))
+
+        # pendaftaran user lain hanya menghapus entri user itu sendiri
+        other = User.objects.create_user(username='student2', password='password123')
+        CourseMember.objects.create(course_id=self.course, user_id=other)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.course.is_member(self.student))
+
+        # hapus keanggotaan -> entri user di-invalidate lewat signal
+        member.delete()
+        self.assertFalse(self.course.is_member(self.student))
+
 class CourseMemberModelTest(TestCase):
 
     def setUp(self):
@@ -69,4 +90,71 @@ class CourseMemberModelTest(TestCase):
 
     def test_course_member_role_options(self):
         # Menguji pilihan peran
-        self.assertIn(self.course_member.roles, dict(ROLE_OPTIONS).keys())
\ No newline at end of file
+        self.assertIn(self.course_member.roles, dict(ROLE_OPTIONS).keys())
+
+class CourseStatsTest(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher1', password='password123')
+        self.student = User.objects.create_user(username='student1', password='password123')
+        self.course = Course.objects.create(
+            name="Django for Beginners",
+            description="Learn Django from scratch.",
+            price=100,
+            teacher=self.teacher
+        )
+
+    def test_counters_follow_creates_and_deletes(self):
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        content = CourseContent.objects.create(course_id=self.course, name="Intro")
+        comment = Comment.objects.create(content_id=content, member_id=member, comment="Halo")
+        Feedback.objects.create(course=self.course, student=self.student, rating=5, comments="Bagus")
+
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual((stats.members_count, stats.content_count, stats.comments_count, stats.feedback_count),
+                         (1, 1, 1, 1))
+
+        comment.delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.comments_count, 0)
+
+    def test_rebuild_matches_source_tables(self):
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        content = CourseContent.objects.create(course_id=self.course, name="Intro")
+        Comment.objects.bulk_create([Comment(content_id=content, member_id=member, comment="Halo") for _ in range(3)])
+        CourseStats.objects.all().delete()
+
+        stats, = CourseStats.rebuild([self.course.id])
+        self.assertEqual((stats.members_count, stats.content_count, stats.comments_count, stats.feedback_count),
+                         (1, 1, 3, 0))
+
+    def test_rating_summary_follows_feedback_changes(self):
+        other = User.objects.create_user(username='student2', password='password123')
+        first = Feedback.objects.create(course=self.course, student=self.student, rating=5, comments="Bagus")
+        Feedback.objects.create(course=self.course, student=other, rating=2, comments="Kurang")
+
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_mean), (2, 7, 3.5))
+        self.assertEqual(stats.rating_histogram, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+
+        # rating diubah lewat objek yang dimuat ulang: selisihnya yang diterapkan
+        edited = Feedback.objects.get(id=first.id)
+        edited.rating = 3
+        edited.save()
+        stats.refresh_from_db()
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_mean), (2, 5, 2.5))
+        self.assertEqual(stats.rating_histogram, {'1': 0, '2': 1, '3': 1, '4': 0, '5': 0})
+
+        edited.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.feedback_count, stats.rating_mean), (1, 2.0))
+
+        Feedback.objects.filter(course=self.course).delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_mean), (0, 0, None))
+
+        # hitung ulang dari tabel sumber menghasilkan ringkasan yang sama
+        Feedback.objects.bulk_create([Feedback(course=self.course, student=self.student, rating=r) for r in (4, 4, 1)])
+        stats, = CourseStats.rebuild([self.course.id])
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_mean), (3, 9, 3.0))
+        self.assertEqual(stats.rating_histogram, {'1': 1, '2': 0, '3': 0, '4': 2, '5': 0})
@@ -1,4 +1,5 @@
 import re
+from itertools import islice
 
 def calculator(a, b, operator):
     if operator == '+':
@@ -25,4 +26,10 @@ def validate_password(password):
         return False
     if not re.search(r"[!@#$%^&*()]", password):  # Memeriksa karakter khusus
         return False
-    return True
\ No newline at end of file
+    return True
+
+def chunked(iterable, size):
+    # Memecah iterable menjadi list berukuran paling banyak `size`
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -7,10 +7,35 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
 
-application = get_asgi_application()
+
+class ConcurrencyLimit:
+    """Batasi jumlah request HTTP yang diproses bersamaan.
+
+    Setiap request async yang menyentuh ORM memakai koneksi database sendiri, jadi
+    tanpa batas ini 500 klien bersamaan berarti 500 koneksi dan melewati
+    max_connections PostgreSQL. Request di atas batas menunggu di event loop
+    (murah) alih-alih gagal.
+    """
+
+    def __init__(self, app, limit):
+        self.app = app
+        self.semaphore = asyncio.Semaphore(limit)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        async with self.semaphore:
+            return await self.app(scope, receive, send)
+
+
+application = ConcurrencyLimit(
+    get_asgi_application(),
+    int(os.environ.get('ASGI_MAX_CONCURRENT_REQUESTS', '64')),
+)
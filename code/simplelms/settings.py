@@ -82,6 +82,53 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# LocMemCache hanya berlaku per proses; di produksi dengan beberapa worker gunakan
+# cache bersama (Redis/Memcached) supaya invalidasi terlihat oleh semua worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Umur maksimum (detik) statistik dashboard user di cache
+DASHBOARD_CACHE_TTL = 300
+
+# Umur maksimum (detik) cache keanggotaan per course yang dipakai untuk otorisasi
+MEMBERSHIP_CACHE_TTL = 300
+
+# Umur maksimum (detik) outline konten per course; dihapus lebih awal saat konten berubah
+OUTLINE_CACHE_TTL = 3600
+
+# Jumlah maksimum access token terverifikasi yang disimpan di memori proses (0 = nonaktif)
+JWT_TOKEN_CACHE_SIZE = 1024
+
+# Serializer JSON untuk apiv1: "orjson" (lebih cepat, dipakai bila terpasang) atau "json" (bawaan)
+API_JSON_BACKEND = 'orjson'
+
+
+# Upload ditulis ke file sementara per chunk, tidak ditampung di memori
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Lebar (px) thumbnail gambar course yang dibuat di background
+COURSE_IMAGE_WIDTHS = [160, 480, 960]
+
+# Jumlah thread worker untuk pekerjaan background (lms_core/tasks.py)
+BACKGROUND_WORKERS = 2
+
+# Course dengan anggota sampai batas ini menyalin pengumuman ke inbox tiap siswa saat ditulis;
+# course yang lebih besar digabung saat inbox dibaca
+INBOX_FANOUT_THRESHOLD = 500
+
+# Bila diisi (mis. '/protected-media/'), lampiran konten dikirim oleh proxy depan lewat
+# header X-Accel-Redirect; lokasi nginx tersebut harus `internal` dan menunjuk ke MEDIA_ROOT
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = None
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 